@@ -0,0 +1,213 @@
+"""
+Spatial statistics of saved runs, beyond the head counts of StatisticGenerator.compute_statistics.
+Every generation becomes one row of a columnar table (a dict of equally long numpy columns) with--
+    1. Clusters -- particles of the same type touching directly form a cluster (wrapping around toroidal boards),
+       for every type the number of clusters, the largest and mean cluster and a histogram of cluster sizes.
+    2. Ages -- the mean age and a histogram of ages of every type, for animations saved with ages
+       (pickled object engine runs and binary files written with save_ages).
+    3. Events -- kills, transformations and infections since the previous generation, as counts and per particle.
+       The frames only show net changes, a particle that died next to one able to kill it (by the rules of the run)
+       counts as killed. Every change from one type to another also gets its own column, like CITIZEN>KILLER.
+    4. Contacts -- the number of direct and diagonal neighbour pairs between every two particle types.
+Histograms have power of two bins (1, 2-3, 4-7, ...). Frames are streamed, never loaded as a whole,
+and binary and delta animations are split into chunks of generations analysed in a pool of worker processes.
+"""
+import csv
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import engine
+import storage
+import topology
+
+BINS = 10
+LIVE = engine.TYPES[1:]
+# Neighbour offsets that lie after a cell, so every pair of neighbours is counted once.
+FORWARD = {contact: [k for k, offset in enumerate(topology.DIRECT + topology.DIAGONAL)
+                     if offset > (0, 0) and (k < len(topology.DIRECT)) == (contact == "DIRECT")]
+           for contact in ("DIRECT", "DIAGONAL")}
+# The Meta entries of Board.meta that the interactions of a run follow from.
+RULE_LABELS = {
+    "Killer Kill Rate": "KILLER_KILL_RATE",
+    "God Kill Rate": "GOD_KILL_RATE",
+    "God Transform Rate": "GOD_TRANSFORM_RATE",
+    "Killer Transform Rate": "KILLER_TRANSFORM_RATE",
+    "Interactions": "INTERACTIONS",
+}
+PAIRS = [(a, b) for a in range(1, len(engine.TYPES)) for b in range(a, len(engine.TYPES))]
+TRANSITIONS = [(a, b) for a in range(len(engine.TYPES)) for b in range(len(engine.TYPES)) if a != b]
+
+
+def bin_labels():
+    return ["1"] + [f"{2 ** k}-{2 ** (k + 1) - 1}" for k in range(1, BINS - 1)] + [f"{2 ** (BINS - 1)}+"]
+
+
+def columns(ages):
+    # Names of the columns of a table, in the order of the values frame_statistics returns.
+    names = ["GENERATION"]
+    for name in LIVE:
+        names += [name, f"{name} CLUSTERS", f"{name} LARGEST CLUSTER", f"{name} MEAN CLUSTER"]
+        names += [f"{name} CLUSTERS {label}" for label in bin_labels()]
+    if ages:
+        for name in LIVE:
+            names += [f"{name} MEAN AGE"] + [f"{name} AGE {label}" for label in bin_labels()]
+    names += ["KILLS", "KILL RATE", "TRANSFORMATIONS", "TRANSFORMATION RATE", "INFECTIONS", "INFECTION RATE"]
+    names += [f"{engine.TYPES[a]}>{engine.TYPES[b]}" for a, b in TRANSITIONS]
+    for contact in FORWARD:
+        names += [f"{contact} {engine.TYPES[a]}-{engine.TYPES[b]}" for a, b in PAIRS]
+    return names
+
+
+def is_float(name):
+    return name.endswith(("RATE", "MEAN CLUSTER", "MEAN AGE"))
+
+
+def killable(meta):
+    # killable[type, contacts] -- whether the interactions of the run can kill a particle touched like that.
+    overrides = {rule: meta[label] for label, rule in RULE_LABELS.items() if label in meta}
+    tables = engine.RuleTables(engine.make_rules(overrides))
+    return (tables.interaction_result == engine.EMPTY) & (tables.interaction_rate > 0)
+
+
+def cluster_labels(flat, padded, table):
+    """
+    Labels every cell with the smallest flat index of its cluster, the cells of the same type it is connected to
+    through direct neighbours. Labels are spread to neighbours and then looked up through themselves,
+    which halves the distance to the smallest index on every pass instead of moving it one cell at a time.
+    """
+    cells = np.arange(flat.size)
+    same = (padded[table[:len(topology.DIRECT)]] == flat) & (flat != engine.EMPTY)
+    neighbours = np.where(same, table[:len(topology.DIRECT)], cells)
+    labels = cells
+    while True:
+        spread = np.minimum(labels, labels[neighbours].min(axis=0))
+        spread = spread[spread]
+        if np.array_equal(spread, labels):
+            return labels
+        labels = spread
+
+
+def histogram(kinds, values):
+    # Histogram over the power of two bins of values (all at least 1) per particle type, shape (len(TYPES), BINS).
+    bins = np.minimum(np.log2(values).astype(np.intp), BINS - 1)
+    return np.bincount(kinds * BINS + bins, minlength=len(engine.TYPES) * BINS).reshape(len(engine.TYPES), BINS)
+
+
+def frame_statistics(generation, codes, ages, previous, table, kills):
+    # One row of the table for a frame, previous is the frame before it (None for the first generation).
+    flat = np.asarray(codes).ravel()
+    # Off board neighbours (index -1) read as the EMPTY appended at the end.
+    padded = np.append(flat, engine.EMPTY)
+    live = flat != engine.EMPTY
+    population = np.bincount(flat, minlength=len(engine.TYPES))
+    roots, sizes = np.unique(cluster_labels(flat, padded, table)[live], return_counts=True)
+    kinds = flat[roots].astype(np.intp)
+    clusters = np.bincount(kinds, minlength=len(engine.TYPES))
+    largest = np.zeros(len(engine.TYPES), dtype=np.int64)
+    np.maximum.at(largest, kinds, sizes)
+    sizes_histogram = histogram(kinds, sizes)
+    row = [generation]
+    for code in range(1, len(engine.TYPES)):
+        row += [population[code], clusters[code], largest[code], population[code] / max(clusters[code], 1)]
+        row += list(sizes_histogram[code])
+    if ages is not None:
+        aged = np.maximum(np.asarray(ages).ravel()[live], 1)
+        totals = np.bincount(flat[live], weights=aged, minlength=len(engine.TYPES))
+        ages_histogram = histogram(flat[live].astype(np.intp), aged)
+        for code in range(1, len(engine.TYPES)):
+            row += [totals[code] / max(population[code], 1)] + list(ages_histogram[code])
+
+    transitions = np.zeros((len(engine.TYPES), len(engine.TYPES)), dtype=np.int64)
+    killed = 0
+    if previous is not None:
+        before = np.asarray(previous).ravel()
+        transitions = np.bincount(before.astype(np.intp) * len(engine.TYPES) + flat,
+                                  minlength=len(engine.TYPES) ** 2).reshape(len(engine.TYPES), len(engine.TYPES))
+        # The contacts every cell had in the previous generation, as in engine.ArrayEngine.transition.
+        neighbours = np.append(before, engine.EMPTY)[table]
+        contacts = np.zeros(flat.size, dtype=np.intp)
+        for bits, rows in zip(engine.CONTACT_BITS, (slice(None, len(topology.DIRECT)),
+                                                    slice(len(topology.DIRECT), None))):
+            contacts |= np.bitwise_or.reduce(np.array(bits)[neighbours[rows]], axis=0)
+        died = (before != engine.EMPTY) & ~live
+        killed = int(kills[before[died], contacts[died]].sum())
+    alive = max(transitions[1:].sum(), 1)
+    transformed = transitions[1:, 1:].sum() - np.trace(transitions[1:, 1:])
+    infected = transitions[:, engine.DISEASED].sum() - transitions[engine.DISEASED, engine.DISEASED]
+    row += [killed, killed / alive, transformed, transformed / alive, infected, infected / alive]
+    row += [transitions[a, b] for a, b in TRANSITIONS]
+
+    for rows in FORWARD.values():
+        pairs = padded[table[rows]]
+        touching = live & (pairs != engine.EMPTY)
+        low, high = np.minimum(flat, pairs)[touching], np.maximum(flat, pairs)[touching]
+        counts = np.bincount(low.astype(np.intp) * len(engine.TYPES) + high, minlength=len(engine.TYPES) ** 2)
+        row += [counts[a * len(engine.TYPES) + b] for a, b in PAIRS]
+    return np.array(row, dtype=np.float64)
+
+
+def saved_ages(reader):
+    # Whether the frames of reader come with ages, and so whether the table has age columns.
+    if isinstance(reader, storage.BinaryReader):
+        return reader.has_ages
+    return isinstance(next(iter(reader.frames(0, 1))), dict)
+
+
+def analyse_range(animation_path, first, last):
+    # Rows of the generations first to last, worker side of analyse. The frame before first is read as well,
+    # to compare first with.
+    reader = storage.open_animation(animation_path)
+    kills = killable(reader.meta)
+    previous, rows, table = None, [], None
+    for generation, (codes, ages) in enumerate(storage.frames_with_ages(reader, max(first - 1, 0), last),
+                                               start=max(first - 1, 0)):
+        if table is None:
+            table = topology.get(codes.shape[0], reader.meta.get("Edges", "bounded")).table
+        if generation >= first:
+            rows.append(frame_statistics(generation, codes, ages, previous, table, kills))
+        previous = codes.copy()
+    if not rows:
+        return np.zeros((0, len(columns(saved_ages(reader)))))
+    return np.array(rows)
+
+
+def analyse(animation_path, start=0, stop=None, workers=1, chunk=100, save_path=None):
+    """
+    Returns the table of spatial statistics (see above) of generations start to stop of the animation,
+    also written to save_path when given (see save_table).
+    Binary and delta animations are analysed chunk generations at a time by workers processes,
+    pickled ones have to be read from the start and are analysed in a single pass.
+    """
+    reader = storage.open_animation(animation_path)
+    ages = saved_ages(reader)
+    if isinstance(reader, storage.AnimationReader) or workers == 1:
+        parts = [analyse_range(animation_path, start, stop)]
+    else:
+        stop = len(reader) if stop is None else min(stop, len(reader))
+        ranges = [(first, min(first + chunk, stop)) for first in range(start, stop, chunk)]
+        parts = []
+        if ranges:
+            firsts, lasts = zip(*ranges)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                parts = list(pool.map(analyse_range, [animation_path] * len(ranges), firsts, lasts))
+    rows = np.concatenate(parts) if parts else np.zeros((0, len(columns(ages))))
+    table = {name: rows[:, k] if is_float(name) else rows[:, k].astype(np.int64)
+             for k, name in enumerate(columns(ages))}
+    if save_path:
+        save_table(table, save_path)
+    return table
+
+
+def save_table(table, path):
+    # .csv, .parquet (needs pandas and pyarrow) or else a compressed numpy .npz archive with one array per column.
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(table)
+            writer.writerows(zip(*(column.tolist() for column in table.values())))
+    elif path.endswith(".parquet"):
+        import pandas as pd
+        pd.DataFrame(table).to_parquet(path)
+    else:
+        with open(path, "wb") as f:
+            np.savez_compressed(f, **table)
+    print(f"Spatial statistics written to {path}")
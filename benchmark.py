@@ -0,0 +1,182 @@
+"""
+Benchmarks for simulation, storage and statistics throughput.
+Every combination of engine, save format, board size, spawn density and tick count is run in a scratch directory,
+and for each one we record--
+    1. Simulation -- Board.compute_board_states in ticks/sec and cells/sec, with its peak traced memory
+       and, for the object engine, the memory one generation of particles holds on to.
+    2. Storage -- the size on disk of the animation and its side files, and how fast load_world streams it back.
+    3. Statistics -- StatisticGenerator.compute_statistics, from the statistics index.
+Results are saved as JSON, and two result files can be compared case by case to catch regressions.
+Usage--
+    python benchmark.py --sizes 50 100 --engines object numpy --output results.json
+    python benchmark.py --compare before.json after.json
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import game_of_life
+import storage
+
+
+def measure(function, repeats):
+    # Best wall time out of repeats runs, then one more run under tracemalloc for the peak memory,
+    # since tracing slows allocation heavy code down too much to time it at the same time.
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, result
+
+
+def generation_bytes(size, density, seed):
+    # Memory held by one generation of the object engine. The empties a board shares between all its
+    # generations are made before tracing starts, since they are only paid for once per board.
+    with contextlib.redirect_stdout(io.StringIO()):
+        world = game_of_life.Board(size=size, num_spawn=int(size * size * density), save_path="", seed=seed)
+    world.empties
+    tracemalloc.start()
+    board = world.first_gen()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del board
+    return held
+
+
+def run_case(directory, engine, save_format, size, density, num_ticks, seed, repeats):
+    path = os.path.join(directory, f"{engine}_{save_format}_{size}_{density}_{num_ticks}")
+
+    def simulate():
+        # Every case is run to num_ticks, even when its board dies out or settles down.
+        for leftover in os.listdir(directory):
+            os.remove(os.path.join(directory, leftover))
+        game_of_life.Board(size=size, num_spawn=int(size * size * density), save_path=path, num_ticks=num_ticks,
+                           engine=engine, seed=seed, save_format=save_format, stop_on=()).compute_board_states()
+
+    def load():
+        return sum(1 for _ in storage.open_animation(path).frames())
+
+    def statistics():
+        return game_of_life.StatisticGenerator(animation_path=path).compute_statistics()
+
+    simulate_time, simulate_peak, _ = measure(simulate, repeats)
+    load_time, load_peak, frames = measure(load, repeats)
+    statistics_time, _, _ = measure(statistics, repeats)
+    files = {name: os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)}
+    return {
+        "Engine": engine,
+        "Format": save_format,
+        "Grid Size": size,
+        "Density": density,
+        "Ticks": num_ticks,
+        # Rates are per generation actually written.
+        "Ticks/sec": frames / simulate_time,
+        "Cells/sec": size * size * frames / simulate_time,
+        "Simulation Seconds": simulate_time,
+        "Simulation Peak Bytes": simulate_peak,
+        "Generation Bytes": generation_bytes(size, density, seed) if engine == "object" else None,
+        "File Bytes": sum(size for name, size in files.items() if not name.endswith((".golc", ".gols"))),
+        "Side File Bytes": sum(size for name, size in files.items() if name.endswith((".golc", ".gols"))),
+        "Load Frames/sec": frames / load_time,
+        "Load Peak Bytes": load_peak,
+        "Statistics Seconds": statistics_time,
+    }
+
+
+def environment():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                  cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        revision = ""
+    return {
+        "Revision": revision,
+        "Python": platform.python_version(),
+        "NumPy": np.__version__,
+        "Machine": platform.platform(),
+        "CPUs": os.cpu_count(),
+    }
+
+
+def run_benchmarks(engines=("object", "numpy", "sparse"), formats=("pickle",), sizes=(50, 100),
+                   densities=(0.1, 0.3), ticks=(50,), seed=0, repeats=1, save_path=None):
+    results = []
+    cases = list(itertools.product(engines, formats, sizes, densities, ticks))
+    with tempfile.TemporaryDirectory() as directory:
+        for number, case in enumerate(cases, start=1):
+            result = run_case(directory, *case, seed=seed, repeats=repeats)
+            results.append(result)
+            print(f"[{number}/{len(cases)}] {' '.join(map(str, case))}: {result['Ticks/sec']:.1f} ticks/sec, "
+                  f"{result['Cells/sec']:.0f} cells/sec, {result['Simulation Peak Bytes'] / 2 ** 20:.1f} MiB peak, "
+                  f"{result['File Bytes'] / 2 ** 20:.2f} MiB on disk")
+    report = {"Environment": environment(), "Results": results}
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {save_path}")
+    return report
+
+
+def compare(before_path, after_path):
+    # Ratios after/before for every case present in both result files, above 1 means after is faster.
+    with open(before_path) as f:
+        before = json.load(f)["Results"]
+    with open(after_path) as f:
+        after = json.load(f)["Results"]
+
+    def key(result):
+        return tuple(result[field] for field in ("Engine", "Format", "Grid Size", "Density", "Ticks"))
+
+    earlier = {key(result): result for result in before}
+    comparison = []
+    for result in after:
+        if key(result) not in earlier:
+            continue
+        old = earlier[key(result)]
+        row = {
+            "Case": key(result),
+            "Ticks/sec": result["Ticks/sec"] / old["Ticks/sec"],
+            "Load Frames/sec": result["Load Frames/sec"] / old["Load Frames/sec"],
+            "Statistics": old["Statistics Seconds"] / result["Statistics Seconds"],
+            "File Bytes": result["File Bytes"] / old["File Bytes"],
+        }
+        comparison.append(row)
+        print(f"{' '.join(map(str, row['Case']))}: simulation {row['Ticks/sec']:.2f}x, "
+              f"load {row['Load Frames/sec']:.2f}x, statistics {row['Statistics']:.2f}x, "
+              f"file size {row['File Bytes']:.2f}x")
+    return comparison
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["object", "numpy", "sparse"])
+    parser.add_argument("--formats", nargs="+", default=["pickle"])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[50, 100])
+    parser.add_argument("--densities", nargs="+", type=float, default=[0.1, 0.3])
+    parser.add_argument("--ticks", nargs="+", type=int, default=[50])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"))
+    args = parser.parse_args()
+    if args.compare:
+        compare(*args.compare)
+    else:
+        run_benchmarks(args.engines, args.formats, args.sizes, args.densities, args.ticks, args.seed, args.repeats,
+                       args.output)
@@ -61,4 +61,14 @@ KILLER_TRANSFORM_RATE = {
 KILLER_GOD_IMM_PENALTY = 0.85
 DISEASED_GOD_IMM_PENALTY = 0.95
 
+# What a particle turns into when it touches others, checked in order: the first contact present applies, e.g.
+# [{"contact": "diagonal", "with": "KILLER", "becomes": "KILLER", "rate": 0.9}, ...].
+# None keeps the behaviour described by the rates above.
+INTERACTIONS = {
+    "CITIZEN": None,
+    "KILLER": None,
+    "DISEASED": None,
+    "GOD": None,
+}
+
 NUM_TICKS = 1000
@@ -0,0 +1,53 @@
+"""
+Notices when a run settles down, so that it can be stopped instead of computing and saving the same board over and over.
+Every generation's particle types are hashed and compared with the generations before them--
+    1. extinction -- no particle is left, and nothing can ever be born on an empty board.
+    2. fixed point -- the board stays the same from one generation to the next.
+    3. cycle -- the board repeats itself every period generations, for periods of 2 up to max_period.
+Runs are random: particles keep ageing and dying, so a board that looks settled can still move on.
+Only extinction is final. A fixed point or cycle is reported once it has held for patience generations.
+"""
+import hashlib
+import numpy as np
+
+EVENTS = ("extinction", "fixed point", "cycle")
+
+
+class SteadyStateDetector:
+    def __init__(self, max_period=8, patience=20):
+        self.max_period = max_period
+        self.patience = patience
+        self.hashes = []
+        # streaks[period] -- for how many generations in a row the board equalled the one period generations before.
+        self.streaks = [0] * (max_period + 1)
+        self.reported = set()
+
+    def observe(self, generation, codes):
+        """
+        Takes the particle type codes of the next generation and returns the event it completes, if any--
+        {"Event": ..., "Generation": generation, "Since": first generation of the pattern, "Period": ...}.
+        Each kind of event is only reported once.
+        """
+        codes = np.ascontiguousarray(codes)
+        if not codes.any():
+            return self.report("extinction", generation, generation, 0)
+        digest = hashlib.blake2b(codes.tobytes(), digest_size=16).digest()
+        self.hashes.append(digest)
+        del self.hashes[:-self.max_period - 1]
+        for period in range(1, self.max_period + 1):
+            if len(self.hashes) > period and self.hashes[-1 - period] == digest:
+                self.streaks[period] += 1
+            else:
+                self.streaks[period] = 0
+        # A fixed point also repeats with every longer period, only the shortest period counts.
+        for period in range(1, self.max_period + 1):
+            if self.streaks[period] >= self.patience:
+                since = generation - self.streaks[period] - period + 1
+                return self.report("fixed point" if period == 1 else "cycle", generation, since, period)
+        return None
+
+    def report(self, kind, generation, since, period):
+        if kind in self.reported:
+            return None
+        self.reported.add(kind)
+        return {"Event": kind, "Generation": generation, "Since": since, "Period": period}
@@ -0,0 +1,429 @@
+"""
+Array backed computation engine for the game of life.
+Instead of keeping one python object per cell, the whole world is stored in three numpy arrays--
+    1. types -- the particle type code of every cell (see TYPES)
+    2. generation -- the age of every particle
+    3. immunity -- the immunity of every particle
+Neighbour counts (all, direct and per type) are computed for the whole board at once by shifting the arrays,
+and every rule is applied to the whole board with a single random draw per rule phase.
+The rules are compiled into lookup tables (see RuleTables), the same ones the particle classes in game_of_life.py
+follow, and can be loaded from a rule file (see load_rules).
+"""
+import copy
+import json
+import time
+import numpy as np
+import constants
+import topology
+
+TYPES = ("EMPTY", "CITIZEN", "KILLER", "DISEASED", "GOD")
+CODES = {name: code for code, name in enumerate(TYPES)}
+EMPTY, CITIZEN, KILLER, DISEASED, GOD = range(len(TYPES))
+
+DIRECT, DIAGONAL = topology.DIRECT, topology.DIAGONAL
+
+
+# The names in constants.py that make up a rule set.
+RULES = (
+    "SPAWN_PROB", "IMMUNITY", "REPRO_SPAWN", "MORTALITY_OP", "MORTALITY_UP", "KILLER_KILL_RATE",
+    "GOD_KILL_RATE", "GOD_TRANSFORM_RATE", "KILLER_TRANSFORM_RATE", "KILLER_GOD_IMM_PENALTY",
+    "DISEASED_GOD_IMM_PENALTY", "INTERACTIONS",
+)
+CONTACTS = ("direct", "diagonal")
+
+
+def make_rules(overrides=None):
+    """
+    Returns the rules in constants.py as a dict, with overrides applied on top.
+    Overrides either replace a whole entry ({"IMMUNITY": {...}}) or one value of it ({"IMMUNITY.CITIZEN": 1000}).
+    """
+    rules = {name: copy.deepcopy(getattr(constants, name)) for name in RULES}
+    for key, value in (overrides or {}).items():
+        name, _, particle = key.partition(".")
+        if name not in RULES or (particle and particle not in rules[name]):
+            raise KeyError(f"Unknown rule {key!r}")
+        if particle:
+            rules[name][particle] = value
+        else:
+            rules[name] = value
+    return rules
+
+
+def load_rules(path):
+    """
+    Reads rule overrides for make_rules from a .json or .toml file.
+    Tables in the file are merged into the rules instead of replacing them, so a file only needs the values
+    it changes, e.g. {"IMMUNITY": {"CITIZEN": 1000}, "KILLER_GOD_IMM_PENALTY": 0.5}.
+    """
+    with open(path, "rb") as f:
+        if path.endswith(".toml"):
+            import tomllib
+            overrides = tomllib.load(f)
+        else:
+            overrides = json.load(f)
+    flat = {}
+    for name, value in overrides.items():
+        if isinstance(value, dict):
+            flat.update({f"{name}.{particle}": entry for particle, entry in value.items()})
+        else:
+            flat[name] = value
+    # Mistakes in the file show up now, not once the rules are used.
+    RuleTables(make_rules(flat))
+    return flat
+
+
+def default_interactions(rules):
+    # The interactions of every particle type that constants.INTERACTIONS leaves to the rates above it.
+    return {
+        "CITIZEN": [
+            {"contact": "direct", "with": "KILLER", "becomes": "EMPTY", "rate": rules["KILLER_KILL_RATE"]["CITIZEN"]},
+            {"contact": "diagonal", "with": "KILLER", "becomes": "KILLER",
+             "rate": rules["KILLER_TRANSFORM_RATE"]["CITIZEN"]},
+        ],
+        "KILLER": [
+            {"contact": "direct", "with": "GOD", "becomes": "EMPTY", "rate": rules["GOD_KILL_RATE"]["KILLER"]},
+            {"contact": "diagonal", "with": "GOD", "becomes": "CITIZEN", "rate": rules["GOD_TRANSFORM_RATE"]["KILLER"]},
+        ],
+        "DISEASED": [
+            {"contact": "direct", "with": "GOD", "becomes": "CITIZEN",
+             "rate": rules["GOD_TRANSFORM_RATE"]["DISEASED"]},
+            {"contact": "direct", "with": "KILLER", "becomes": "EMPTY", "rate": rules["KILLER_KILL_RATE"]["DISEASED"]},
+        ],
+        "GOD": [],
+    }
+
+
+def contact_bit(contact, code):
+    # The bit of a contact signature that is set when a particle of type code touches a cell that way.
+    if contact not in CONTACTS:
+        raise ValueError(f"Unknown contact {contact!r}, expected one of {CONTACTS}")
+    return 1 << (code - 1 + (len(TYPES) - 1) * CONTACTS.index(contact))
+
+
+# contact_bit by contact and type code, no bit for EMPTY.
+CONTACT_BITS = tuple(tuple(contact_bit(contact, code) if code else 0 for code in range(len(TYPES)))
+                     for contact in CONTACTS)
+
+
+def birth_signature(citizens, killers, diseased, gods):
+    # The index into RuleTables.birth_bounds of an empty cell with these neighbours, three of them at most.
+    return citizens + 4 * killers + 16 * diseased + 64 * gods
+
+
+class RuleTables:
+    """
+    A rule set compiled into lookup tables, so that applying a rule is an index into an array--
+        1. immunity[type] -- the immunity a new particle starts with.
+        2. mortality[type, neighbours] -- the chance of dying of under or over population.
+        3. interaction_rate[type, contacts] and interaction_result[type, contacts] -- the chance of turning into
+           another type and that type, given the kinds of particles that touch the cell directly and diagonally
+           (one contact_bit each). The first interaction of a type whose contact is present applies.
+        4. god_penalty[killers, diseased] -- what a god's immunity is multiplied by for its direct contacts.
+        5. birth_bounds[birth_signature] -- the cumulative chances of every type but GOD being born into an empty
+           cell with exactly three neighbours, the born type is the number of bounds the draw is not below.
+    Both the particle classes and the array engines apply the rules through these tables.
+    """
+    def __init__(self, rules):
+        self.immunity = lookup_table(rules["IMMUNITY"])
+        self.mortality = np.zeros((len(TYPES), 9), dtype=np.float64)
+        self.mortality[:, :2] = lookup_table(rules["MORTALITY_UP"])[:, None]
+        self.mortality[:, 4:] = lookup_table(rules["MORTALITY_OP"])[:, None]
+
+        signatures = 1 << 2 * (len(TYPES) - 1)
+        self.interaction_rate = np.zeros((len(TYPES), signatures), dtype=np.float64)
+        self.interaction_result = np.tile(np.arange(len(TYPES), dtype=np.uint8)[:, None], signatures)
+        defaults = default_interactions(rules)
+        for name, interactions in rules["INTERACTIONS"].items():
+            code, decided = CODES[name], np.zeros(signatures, dtype=bool)
+            for interaction in defaults[name] if interactions is None else interactions:
+                bit = contact_bit(interaction["contact"], CODES[interaction["with"]])
+                applies = ~decided & (np.arange(signatures) & bit > 0)
+                self.interaction_rate[code, applies] = interaction["rate"]
+                self.interaction_result[code, applies] = CODES[interaction["becomes"]]
+                decided |= applies
+
+        self.god_penalty = np.array([[rules["KILLER_GOD_IMM_PENALTY"] ** killers
+                                      * rules["DISEASED_GOD_IMM_PENALTY"] ** diseased
+                                      for diseased in range(5)] for killers in range(5)])
+
+        # Offspring of a diseased particle is diseased, then of a killer a killer, two gods make a god,
+        # and anything else draws a citizen, killer or god by REPRO_SPAWN.
+        repro = [0, rules["REPRO_SPAWN"]["CITIZEN"], rules["REPRO_SPAWN"]["KILLER"], 0, rules["REPRO_SPAWN"]["GOD"]]
+        random_spawn = np.cumsum(repro)[:-1] / sum(repro)
+        self.birth_bounds = np.ones((birth_signature(4, 4, 4, 4), len(TYPES) - 1), dtype=np.float64)
+        for citizens in range(4):
+            for killers in range(4 - citizens):
+                for diseased in range(4 - citizens - killers):
+                    gods = 3 - citizens - killers - diseased
+                    signature = birth_signature(citizens, killers, diseased, gods)
+                    born = DISEASED if diseased else KILLER if killers else GOD if gods == 2 else None
+                    if born is None:
+                        self.birth_bounds[signature] = random_spawn
+                    else:
+                        self.birth_bounds[signature] = np.arange(1, len(TYPES)) > born
+
+
+def lap(profiler, phase, clock):
+    # Books the time since clock to phase and returns the new clock.
+    now = time.perf_counter()
+    profiler.add(phase, now - clock)
+    return now
+
+
+def lookup_table(values, default=0.0):
+    # Turns a {"CITIZEN": x, ...} dict from constants.py into an array indexed by type code.
+    table = np.full(len(TYPES), default, dtype=np.float64)
+    for name, value in values.items():
+        table[CODES[name]] = value
+    return table
+
+
+MASK64 = (1 << 64) - 1
+GAMMA = 0x9E3779B97F4A7C15
+
+
+def mix64(z):
+    # The SplitMix64 finaliser, on python ints or uint64 arrays alike.
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9
+    z = (z & MASK64) if isinstance(z, int) else z
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EB
+    z = (z & MASK64) if isinstance(z, int) else z
+    return z ^ (z >> 31)
+
+
+class CounterRandom:
+    """
+    Counter based random numbers: the draws for a cell depend only on the seed, the tick, the rule phase
+    and the cell's position, never on how the board was split up or in what order it was computed.
+    Every (tick, phase) is a SplitMix64 stream seeded from the seed, and the draw of a cell is the output of
+    that stream at the cell's flat index, which can be computed directly for any set of cells.
+    """
+    def __init__(self, seed):
+        self.key = int(np.random.SeedSequence(seed).generate_state(1, np.uint64)[0])
+
+    def at(self, tick, cells, phases=3):
+        # Uniform draws in [0, 1) of shape (phases, *cells.shape) for the given flat cell indices.
+        cells = np.asarray(cells, dtype=np.uint64) + np.uint64(1)
+        draws = np.empty((phases,) + cells.shape, dtype=np.float64)
+        with np.errstate(over="ignore"):
+            for phase in range(phases):
+                stream = np.uint64(mix64((self.key ^ mix64(((tick << 2) | phase) * GAMMA & MASK64)) & MASK64))
+                bits = mix64(stream + cells * np.uint64(GAMMA))
+                draws[phase] = (bits >> np.uint64(11)) * (1.0 / (1 << 53))
+        return draws
+
+    def uniform(self, tick, size, first_row, last_row, phases=3):
+        # Draws of shape (phases, rows, size) for a block of whole rows.
+        cells = np.arange(first_row * size, last_row * size, dtype=np.uint64).reshape(last_row - first_row, size)
+        return self.at(tick, cells, phases)
+
+
+class ArrayEngine:
+    def __init__(self, size, num_spawn, spawn_probs=None, seed=None, rules=None, edges="bounded"):
+        self.size = size
+        self.topology = topology.get(size, edges)
+        self.num_spawn = num_spawn
+        self.rules = make_rules(rules)
+        self.spawn_probs = spawn_probs or self.rules["SPAWN_PROB"]
+        # Parallel engines have to agree on the seed, so an unseeded run picks one up front.
+        self.seed = np.random.SeedSequence().entropy if seed is None else seed
+        self.rng = np.random.default_rng(self.seed)
+        self.random = CounterRandom(self.seed)
+        self.tick = 0
+        # A profiling.Profiler, set by Board when profiling is on.
+        self.profiler = None
+        self.types = np.zeros((size, size), dtype=np.uint8)
+        self.generation = np.zeros((size, size), dtype=np.uint32)
+        self.immunity = np.zeros((size, size), dtype=np.float64)
+        self.tables = RuleTables(self.rules)
+
+    def first_gen(self):
+        cells = self.rng.integers(0, self.size * self.size, size=self.num_spawn)
+        weights = np.array([self.spawn_probs[name] for name in TYPES[1:]], dtype=np.float64)
+        kinds = self.rng.choice(np.arange(1, len(TYPES), dtype=np.uint8), size=self.num_spawn, p=weights / weights.sum())
+        self.types.fill(EMPTY)
+        # Later spawns overwrite earlier ones on the same cell, just like Board.first_gen.
+        self.types.flat[cells] = kinds
+        self.renew(self.types, self.generation, self.immunity, self.types != EMPTY)
+        return self.types
+
+    def renew(self, types, generation, immunity, mask):
+        # Freshly created particles start at generation 1 with the default immunity of their type.
+        generation[mask] = 1
+        immunity[mask] = self.tables.immunity[types[mask]]
+
+    def state(self):
+        return {"types": self.types.copy(), "generation": self.generation.copy(), "immunity": self.immunity.copy(),
+                "tick": self.tick}
+
+    def restore(self, state):
+        self.types = state["types"].copy()
+        self.generation = state["generation"].copy()
+        self.immunity = state["immunity"].copy()
+        self.tick = state["tick"]
+
+    def neighbour_counts(self, types):
+        """
+        Returns (every, direct) arrays of shape (len(TYPES), rows, size), holding for every cell of types the
+        number of neighbours of each type among all eight neighbours and among the four direct neighbours.
+        types may be a block of whole rows, the counts of its outermost rows are then only right
+        if the block reaches the edge of the board there (or is the whole board of a toroidal one).
+        Any leading axes of types are separate boards, like the replicates of an ensemble.
+        """
+        rows, size = types.shape[-2:]
+        one_hot = np.zeros((len(TYPES),) + types.shape[:-2] + (rows + 2, size + 2), dtype=np.uint8)
+        for code in range(1, len(TYPES)):
+            one_hot[code, ..., 1:-1, 1:-1] = types == code
+        self.topology.fill_halo(one_hot)
+        direct = np.zeros((len(TYPES),) + types.shape, dtype=np.uint8)
+        diagonal = np.zeros((len(TYPES),) + types.shape, dtype=np.uint8)
+        for counts, offsets in ((direct, DIRECT), (diagonal, DIAGONAL)):
+            for di, dj in offsets:
+                counts += one_hot[..., 1 + di:1 + di + rows, 1 + dj:1 + dj + size]
+        return direct + diagonal, direct
+
+    def step(self):
+        draws = self.random.uniform(self.tick, self.size, 0, self.size)
+        self.types = self.advance(self.types, self.generation, self.immunity, draws)
+        self.tick += 1
+        return self.types
+
+    def advance(self, window, generation, immunity, draws, top=0, bottom=0):
+        """
+        Computes the next generation of a block of rows and returns their new type codes.
+        window holds the rows being advanced plus top halo rows above and bottom halo rows below them.
+        generation and immunity hold only the advanced rows and are updated in place,
+        draws are the uniform draws of those rows for each rule phase.
+        Every neighbour lookup reads the previous generation, so all cells are updated synchronously.
+        """
+        clock = time.perf_counter() if self.profiler else 0
+        every, direct = self.neighbour_counts(window)
+        if self.profiler:
+            lap(self.profiler, "neighbours", clock)
+        rows = slice(top, window.shape[0] - bottom)
+        return self.transition(window[rows], every[:, rows], direct[:, rows], generation, immunity, draws)
+
+    def transition(self, types, every, direct, generation, immunity, draws):
+        """
+        Applies the rules to any set of cells, given their neighbour counts from neighbour_counts.
+        The cells can be laid out in any shape, as long as every argument has that shape
+        (after the leading type or phase axis of every, direct and draws).
+        """
+        profiler = self.profiler
+        clock = time.perf_counter() if profiler else 0
+        total = every.sum(axis=0)
+
+        # Declining immunity as you age
+        live = types != EMPTY
+        with np.errstate(divide="ignore", invalid="ignore"):
+            dying_probability = generation / immunity
+        dies = live & (draws[0] < dying_probability)
+        generation[live & ~dies] += 1
+        types = np.where(dies, EMPTY, types).astype(np.uint8)
+        if profiler:
+            profiler.count("immunity deaths", dies.sum())
+            clock = lap(profiler, "immunity", clock)
+
+        # Under and over population
+        tables = self.tables
+        dies = draws[1] < tables.mortality[types, total]
+        types[dies] = EMPTY
+        if profiler:
+            profiler.count("population deaths", dies.sum())
+            clock = lap(profiler, "population", clock)
+
+        # Interactions, looked up by the kinds of particles that touch every cell directly and diagonally.
+        draw = draws[2]
+        contacts = np.zeros(types.shape, dtype=np.intp)
+        for code in range(1, len(TYPES)):
+            contacts += (direct[code] > 0) * contact_bit("direct", code)
+            contacts += (every[code] > direct[code]) * contact_bit("diagonal", code)
+        interacts = draw < tables.interaction_rate[types, contacts]
+        after = np.where(interacts, tables.interaction_result[types, contacts], types)
+        transformed = interacts & (after != EMPTY)
+        gods = types == GOD
+        immunity[gods] *= tables.god_penalty[direct[KILLER][gods], direct[DISEASED][gods]]
+
+        # Reproduction into empty cells with exactly three neighbours
+        born = (types == EMPTY) & (total == 3)
+        signature = birth_signature(*(every[code][born].astype(np.intp) for code in range(1, len(TYPES))))
+        after[born] = (draw[born][:, None] >= tables.birth_bounds[signature]).sum(axis=1)
+
+        self.renew(after, generation, immunity, born | transformed)
+        empty = after == EMPTY
+        generation[empty] = 0
+        immunity[empty] = 0
+        if profiler:
+            live = types != EMPTY
+            profiler.count("kills", (live & empty).sum())
+            profiler.count("transformations", (live & ~empty & (after != types)).sum())
+            profiler.count("births", born.sum())
+            lap(profiler, "interactions", clock)
+        return after
+
+
+class SparseEngine(ArrayEngine):
+    """
+    Only evaluates the cells that can change: the live ones and their neighbours.
+    An empty cell with no live neighbour stays empty under every rule, so skipping it changes nothing and
+    results are identical to ArrayEngine for the same seed, while the work per tick follows the number of
+    live cells instead of the size of the board. The next generation's live cells are always among this
+    generation's evaluated cells, so the board is never scanned as a whole.
+    Neighbours are gathered from the precomputed table of the board's topology.
+    Every evaluated cell costs about six times what a cell of a whole board step does, so the crossover is
+    at about 15% of the board evaluated (around 2% live when the live cells are scattered, more when they
+    cluster). Above DENSE_FRACTION the whole board is stepped with ArrayEngine.advance instead, which gives
+    the same results as the draws are counter based.
+    """
+    DENSE_FRACTION = 0.15
+
+    def __init__(self, size, num_spawn, spawn_probs=None, seed=None, rules=None, edges="bounded"):
+        super().__init__(size, num_spawn, spawn_probs=spawn_probs, seed=seed, rules=rules, edges=edges)
+        self.live = np.empty(0, dtype=np.int64)
+
+    def first_gen(self):
+        super().first_gen()
+        self.live = np.flatnonzero(self.types)
+        return self.types
+
+    def restore(self, state):
+        super().restore(state)
+        self.live = np.flatnonzero(self.types)
+
+    def step(self):
+        limit = self.DENSE_FRACTION * self.size * self.size
+        # The evaluated cells include the live ones, so a board this full is stepped whole without merging them.
+        if len(self.live) > limit:
+            return self.dense_step()
+        clock = time.perf_counter() if self.profiler else 0
+        table = self.topology.table
+        around = table[:, self.live]
+        active = np.union1d(self.live, around[around >= 0])
+        if len(active) > limit:
+            return self.dense_step()
+        around = table[:, active]
+        inside = around >= 0
+        codes = np.where(inside, self.types.ravel()[np.where(inside, around, 0)], EMPTY)
+        every = np.zeros((len(TYPES), len(active)), dtype=np.uint8)
+        direct = np.zeros((len(TYPES), len(active)), dtype=np.uint8)
+        for code in range(1, len(TYPES)):
+            matches = codes == code
+            direct[code] = matches[:len(DIRECT)].sum(axis=0)
+            every[code] = direct[code] + matches[len(DIRECT):].sum(axis=0)
+        if self.profiler:
+            lap(self.profiler, "neighbours", clock)
+        generation = self.generation.ravel()[active]
+        immunity = self.immunity.ravel()[active]
+        draws = self.random.at(self.tick, active)
+        after = self.transition(self.types.ravel()[active], every, direct, generation, immunity, draws)
+        self.types.ravel()[active] = after
+        self.generation.ravel()[active] = generation
+        self.immunity.ravel()[active] = immunity
+        self.live = active[after != EMPTY]
+        self.tick += 1
+        return self.types
+
+    def dense_step(self):
+        super().step()
+        self.live = np.flatnonzero(self.types)
+        return self.types
@@ -0,0 +1,129 @@
+"""
+Monte Carlo ensembles: many replicates of one configuration that only differ in their seeds.
+    1. Replicates are stepped together by EnsembleEngine as (replicates, size, size) arrays, so every numpy
+       operation works on a whole batch of them at once, and batches are spread over a pool of worker processes.
+    2. Only the population of every particle type in every replicate at every tick is kept, never a frame.
+    3. Replicate r follows exactly the run engine.ArrayEngine makes with seed seeds[r].
+Tick 0 is the first generation, like in sweep.py. The populations are saved to a .gole file,
+which StatisticGenerator plots as the mean of every particle type with a percentile band around it.
+"""
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import engine
+
+# Cells stepped together per batch by default. Batching pays on small boards, where numpy's per call overhead
+# dominates (about 3x on 20x20 boards), but once a batch outgrows the cpu caches it is slower than stepping
+# the replicates one by one, which already happens from 60x60 boards on.
+BATCH_CELLS = 6400
+
+
+class EnsembleEngine(engine.ArrayEngine):
+    def __init__(self, size, num_spawn, seeds, spawn_probs=None, rules=None, edges="bounded"):
+        super().__init__(size, num_spawn, spawn_probs=spawn_probs, seed=seeds[0], rules=rules, edges=edges)
+        self.seeds = list(seeds)
+        self.randoms = [engine.CounterRandom(seed) for seed in self.seeds]
+        shape = (len(self.seeds), size, size)
+        self.types = np.zeros(shape, dtype=np.uint8)
+        self.generation = np.zeros(shape, dtype=np.uint32)
+        self.immunity = np.zeros(shape, dtype=np.float64)
+
+    def first_gen(self):
+        for replicate, seed in enumerate(self.seeds):
+            single = engine.ArrayEngine(self.size, self.num_spawn, spawn_probs=self.spawn_probs, seed=seed,
+                                        rules=self.rules, edges=self.topology.edges)
+            self.types[replicate] = single.first_gen()
+            self.generation[replicate] = single.generation
+            self.immunity[replicate] = single.immunity
+        return self.types
+
+    def step(self):
+        # Every replicate draws from its own streams, so it does not matter which batch it is stepped in.
+        draws = np.stack([stream.uniform(self.tick, self.size, 0, self.size) for stream in self.randoms], axis=1)
+        every, direct = self.neighbour_counts(self.types)
+        self.types = self.transition(self.types, every, direct, self.generation, self.immunity, draws)
+        self.tick += 1
+        return self.types
+
+    def populations(self):
+        # Number of particles of every type in every replicate, shape (replicates, len(TYPES)).
+        replicates = len(self.seeds)
+        offsets = (np.arange(replicates) * len(engine.TYPES))[:, None, None]
+        counts = np.bincount((self.types + offsets).ravel(), minlength=replicates * len(engine.TYPES))
+        return counts.reshape(replicates, len(engine.TYPES))
+
+
+def simulate_batch(size, num_spawn, num_ticks, seeds, spawn_probs=None, rules=None, edges="bounded"):
+    # Populations of a batch of replicates, shape (num_ticks + 1, replicates, len(TYPES)).
+    world = EnsembleEngine(size, num_spawn, seeds, spawn_probs=spawn_probs, rules=rules, edges=edges)
+    world.first_gen()
+    populations = np.zeros((num_ticks + 1, len(seeds), len(engine.TYPES)), dtype=np.int64)
+    # Once every replicate is extinct the boards stay empty, which is what the rest of the ticks are left at.
+    populations[:, :, engine.EMPTY] = size * size
+    for tick in range(num_ticks + 1):
+        if tick:
+            world.step()
+        populations[tick] = world.populations()
+        if not world.types.any():
+            break
+    return populations
+
+
+class Ensemble:
+    def __init__(self, populations, meta):
+        self.populations = populations
+        self.meta = meta
+
+    def __len__(self):
+        return self.populations.shape[1]
+
+    def band(self, name, percentiles=(5, 95), start=0, stop=None):
+        # Mean and the given percentiles over the replicates of the population of one particle type, per tick.
+        population = self.populations[start:stop, :, engine.CODES[name]]
+        return (population.mean(axis=1),) + tuple(np.percentile(population, percentiles, axis=1))
+
+    def save(self, path):
+        with open(f"{path}.gole", "wb") as f:
+            np.savez_compressed(f, populations=self.populations, meta=np.array(json.dumps(self.meta)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(f"{path}.gole") as data:
+            return cls(data["populations"], json.loads(str(data["meta"])))
+
+
+def run_ensemble(size, num_spawn, num_ticks, replicates, seed=None, spawn_probs=None, rules=None,
+                 edges="bounded", batch=None, workers=None, save_path=None):
+    """
+    Simulates replicates runs of one configuration, batch replicates at a time (see BATCH_CELLS)
+    in a pool of worker processes, and returns their populations as an Ensemble, also saved to save_path.gole
+    when given.
+    rules are overrides of constants.py (see engine.make_rules) or the path of a rule file.
+    """
+    seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+    seeds = np.random.SeedSequence(seed).generate_state(replicates, np.uint64).tolist()
+    rules = engine.load_rules(rules) if isinstance(rules, str) else rules
+    batch = batch or max(BATCH_CELLS // (size * size), 1)
+    batches = [seeds[first:first + batch] for first in range(0, replicates, batch)]
+    print(f"Simulating {replicates} replicates in {len(batches)} batches...")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        parts = list(pool.map(simulate_batch, itertools.repeat(size), itertools.repeat(num_spawn),
+                              itertools.repeat(num_ticks), batches, itertools.repeat(spawn_probs),
+                              itertools.repeat(rules), itertools.repeat(edges)))
+    print("Ensemble Completed!")
+    ensemble = Ensemble(np.concatenate(parts, axis=1), {
+        "Grid Size": size,
+        "Spawned Elements": num_spawn,
+        "No. of generations computed": num_ticks,
+        "Replicates": replicates,
+        "Seed": seed,
+        "Seeds": seeds,
+        "Edges": edges,
+        "Rules": rules,
+    })
+    if save_path:
+        ensemble.save(save_path)
+    return ensemble
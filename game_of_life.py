@@ -35,37 +35,59 @@ We will build a custom datastructure for storing information for one complete ge
 We will build a simulator to display a list of generation datastructures frame by frame.
 Let the fun begin!
 """
-import copy
 import time
-import turtle
+import functools
 import constants
 import random
-import pickle
 import os
+import pickle
+import queue
+import threading
+import itertools
 import json
-import seaborn as sns
-import matplotlib.pyplot as plt
+import numpy as np
+import analytics
+import detection
+import engine
+import ensemble
+import parallel
+import profiling
+import storage
+import topology
+
+
+class Particle:
+    # What all particles of a kind share (code, name, color) lives on their class, only what differs between
+    # them is kept in the slots of an instance.
+    __slots__ = ()
+
+    def __str__(self):
+        return self.name
+
+    __repr__ = __str__
 
+    def __setstate__(self, state):
+        # Frames pickled before particles had slots keep a __dict__ (with a color in it) instead of slot values.
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for name, value in state.items():
+            if name != "color":
+                setattr(self, name, value)
+
+
+class Empty(Particle):
+    # Empty cells only differ in where they are, so a board has one Empty per cell, see Board.empties.
+    __slots__ = ("position", "world")
+    code = engine.EMPTY
+    name = "EMPTY"
+    color = constants.COLORS["EMPTY"]
 
-class Empty:
     def __init__(self, position, world):
-        self.color = constants.COLORS["EMPTY"]
         self.position = position
         self.world = world
 
-    def __str__(self):
-        return "EMPTY"
-
-    __repr__ = __str__
-
     def all_valid_neighbours(self, board):
-        i, j = self.position
-        an = (
-            (i - 1, j - 1), (i, j - 1), (i + 1, j - 1),
-            (i - 1, j), (i + 1, j),
-            (i - 1, j + 1), (i, j + 1), (i + 1, j + 1)
-        )
-        return (board[i, j] for i, j in an if 0 < i < self.world.size and 0 < j < self.world.size)
+        return (board[position] for position in self.world.topology.neighbour_positions[self.position])
 
     def enumerate_neighbors(self, board):
         ALL_CLASSES = {
@@ -80,14 +102,6 @@ class Empty:
         del ALL_CLASSES["EMPTY"]
         return ALL_CLASSES
 
-    def choose_random_spawn(self):
-        # This function is called when none of the special reproduction capabilities are being satisfied.
-        return random.choices([
-            Citizen(position=self.position, world=self.world),
-            Killer(position=self.position, world=self.world),
-            God(position=self.position, world=self.world),
-        ], weights=constants.REPRO_SPAWN.values(), k=1)[0]
-
     def enforce_basic_rules(self, board):
         return self
 
@@ -95,41 +109,37 @@ class Empty:
         return self
 
     def interact(self, board):
-        ALL_CLASSES = self.enumerate_neighbors(board)
+        counts = [0] * len(PARTICLES)
+        for neighbour in self.all_valid_neighbours(board):
+            counts[neighbour.code] += 1
         # check if there are exactly three neighbours
-        if sum(ALL_CLASSES.values()) == 3:
-            if ALL_CLASSES["DISEASED"]:
-                return Diseased(position=self.position, world=self.world)
-            elif ALL_CLASSES["KILLER"]:
-                return Killer(position=self.position, world=self.world)
-            elif ALL_CLASSES["GOD"] == 2:
-                return God(position=self.position, world=self.world)
-            else:
-                return self.choose_random_spawn()
+        if sum(counts) - counts[engine.EMPTY] == 3:
+            # What is born depends on what the three neighbours are, see engine.RuleTables.birth_bounds.
+            bounds = self.world.tables.birth_bounds[engine.birth_signature(*counts[1:])]
+            born = int((self.world.draw(2, self.position) >= bounds).sum())
+            return self.world.particle(born, self.position)
         return self
 
 
-class Citizen:
-    def __init__(self, position, world, immunity=constants.IMMUNITY["CITIZEN"]):
-        self.immunity = immunity
+class Citizen(Particle):
+    __slots__ = ("immunity", "position", "world", "generation")
+    code = engine.CITIZEN
+    name = "CITIZEN"
+    color = constants.COLORS["CITIZEN"]
+
+    def __init__(self, position, world, immunity=None):
+        # Particles start out with the immunity their kind has in the world's rules.
+        self.immunity = float(world.tables.immunity[self.code]) if immunity is None else immunity
         self.position = position
         self.world = world
-        self.color = constants.COLORS["CITIZEN"]
         self.generation = 1
 
-    def __str__(self):
-        return "CITIZEN"
-
-    __repr__ = __str__
-
     def apply_immunity(self):
         dying_probability = self.generation / self.immunity
-        will_live = random.choices([0, 1], weights=(dying_probability, 1 - dying_probability), k=1)[0]
-        if will_live:
-            self.generation += 1
-            return self
-        else:
-            return Empty(position=self.position, world=self.world)
+        if self.world.draw(0, self.position) < dying_probability:
+            return self.world.empties[self.position]
+        self.generation += 1
+        return self
 
     @staticmethod
     def evaluate_weight(obj):
@@ -138,249 +148,591 @@ class Citizen:
         return 1
 
     def num_neighbours(self, board):
-        i, j = self.position
-        an = (
-            (i - 1, j - 1), (i, j - 1), (i + 1, j - 1),
-            (i - 1, j), (i + 1, j),
-            (i - 1, j + 1), (i, j + 1), (i + 1, j + 1)
-        )
-        valid = (self.evaluate_weight(board[i, j]) for i, j in an if 0 < i < self.world.size and 0 < j < self.world.size)
+        valid = (self.evaluate_weight(board[position])
+                 for position in self.world.topology.neighbour_positions[self.position])
         return sum(valid)
 
     def find_neighbours(self):
-        i, j = self.position
+        # The positions are precomputed by the board's topology and already left out where the board ends.
+        topology = self.world.topology
         return {
-            "DIRECT": (
-                (i, j - 1), (i - 1, j), (i + 1, j), (i, j + 1),
-            ),
-            "DIAGONAL": (
-                (i - 1, j - 1), (i + 1, j - 1),
-                (i - 1, j + 1), (i + 1, j + 1),
-            )
+            "DIRECT": topology.direct_positions[self.position],
+            "DIAGONAL": topology.diagonal_positions[self.position],
         }
 
+    def contacts(self, board):
+        # The kinds of particles touching this one directly and diagonally, one engine.contact_bit each.
+        all_neighbours = self.find_neighbours()
+        direct, diagonal = engine.CONTACT_BITS
+        signature = 0
+        for position in all_neighbours["DIRECT"]:
+            signature |= direct[board[position].code]
+        for position in all_neighbours["DIAGONAL"]:
+            signature |= diagonal[board[position].code]
+        return signature
+
     def enforce_basic_rules(self, board):
         # Enforce the basic rules that you can die of under or over population
         ns = self.num_neighbours(board)
-        if ns not in (2, 3):
-            if ns < 2:
-                return random.choices((Empty(position=self.position, world=self.world), self),
-                                      weights=(constants.MORTALITY_UP[self.__str__()],
-                                               1 - constants.MORTALITY_UP[self.__str__()]))[0]
-            else:
-                return random.choices((Empty(position=self.position, world=self.world), self),
-                                      weights=(constants.MORTALITY_OP[self.__str__()],
-                                               1 - constants.MORTALITY_OP[self.__str__()]))[0]
+        if self.world.draw(1, self.position) < self.world.tables.mortality[self.code, ns]:
+            return self.world.empties[self.position]
         return self
 
     def interact(self, board):
-        all_neighbours = self.find_neighbours()
-        direct_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                             0 < i < self.world.size and 0 < j < self.world.size]
-        diagonal_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                               0 < i < self.world.size and 0 < j < self.world.size]
-        # check if killer is directly in contact
-        for check in direct_neighbours:
-            if isinstance(check, Killer):
-                return random.choices([
-                    Empty(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.KILLER_KILL_RATE["CITIZEN"],
-                    1 - constants.KILLER_KILL_RATE["CITIZEN"],
-                ))[0]
-        # check if killer is diagonally in contact
-        for check in diagonal_neighbours:
-            if isinstance(check, Killer):
-                return random.choices([
-                    Killer(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.KILLER_TRANSFORM_RATE["CITIZEN"],
-                    1 - constants.KILLER_TRANSFORM_RATE["CITIZEN"],
-                ))[0]
+        # Killing, curing and converting are all looked up in the world's rule tables by what touches us.
+        tables, signature = self.world.tables, self.contacts(board)
+        if self.world.draw(2, self.position) < tables.interaction_rate[self.code, signature]:
+            return self.world.particle(int(tables.interaction_result[self.code, signature]), self.position)
         return self
 
 
 class Killer(Citizen):
-    def __init__(self, position, world, immunity=constants.IMMUNITY["KILLER"]):
-        super().__init__(immunity, world)
-        self.immunity = immunity
-        self.position = position
-        self.world = world
-        self.color = constants.COLORS["KILLER"]
-        self.generation = 1
+    __slots__ = ()
+    code = engine.KILLER
+    name = "KILLER"
+    color = constants.COLORS["KILLER"]
 
-    def __str__(self):
-        return "KILLER"
 
-    __repr__ = __str__
+class Diseased(Citizen):
+    __slots__ = ()
+    code = engine.DISEASED
+    name = "DISEASED"
+    color = constants.COLORS["DISEASED"]
 
-    def interact(self, board):
-        all_neighbours = self.find_neighbours()
-        direct_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                             0 < i < self.world.size and 0 < j < self.world.size]
-        diagonal_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                               0 < i < self.world.size and 0 < j < self.world.size]
-        # Check if in direct contact with a god
-        for check in direct_neighbours:
-            if isinstance(check, God):
-                return random.choices([
-                    Empty(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.GOD_KILL_RATE["KILLER"],
-                    1 - constants.GOD_KILL_RATE["KILLER"],
-                ))[0]
-        # Check if in diagonal contact with a god
-        for check in diagonal_neighbours:
-            if isinstance(check, God):
-                return random.choices([
-                    Citizen(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.GOD_TRANSFORM_RATE["KILLER"],
-                    1 - constants.GOD_TRANSFORM_RATE["KILLER"],
-                ))[0]
-        return self
 
+class God(Citizen):
+    __slots__ = ()
+    code = engine.GOD
+    name = "GOD"
+    color = constants.COLORS["GOD"]
 
-class Diseased(Citizen):
-    def __init__(self, position, world, immunity=constants.IMMUNITY["DISEASED"]):
-        super().__init__(immunity, world)
-        self.immunity = immunity
-        self.position = position
-        self.world = world
-        self.color = constants.COLORS["DISEASED"]
-        self.generation = 1
+    def interact(self, board):
+        # Every killer and diseased particle in direct contact wears the immunity of a god down.
+        direct = [board[position].code for position in self.world.topology.direct_positions[self.position]]
+        penalty = self.world.tables.god_penalty[direct.count(engine.KILLER), direct.count(engine.DISEASED)]
+        self.immunity *= float(penalty)
+        return super().interact(board)
 
-    def __str__(self):
-        return "DISEASED"
 
-    __repr__ = __str__
+# Particle classes by type code (see engine.TYPES).
+PARTICLES = (Empty, Citizen, Killer, Diseased, God)
 
-    def interact(self, board):
-        all_neighbours = self.find_neighbours()
-        direct_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                             0 < i < self.world.size and 0 < j < self.world.size]
-        # Check if in direct contact with a god
-        for check in direct_neighbours:
-            if isinstance(check, God):
-                return random.choices([
-                    Citizen(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.GOD_TRANSFORM_RATE["DISEASED"],
-                    1 - constants.GOD_TRANSFORM_RATE["DISEASED"],
-                ))[0]
-        # check if killer is directly in contact
-        for check in direct_neighbours:
-            if isinstance(check, Killer):
-                return random.choices([
-                    Empty(position=self.position, world=self.world),
-                    self
-                ], weights=(
-                    constants.KILLER_KILL_RATE["DISEASED"],
-                    1 - constants.KILLER_KILL_RATE["DISEASED"],
-                ))[0]
-        return self
 
+def frame_counts(tick):
+    # Number of particles of every kind (including EMPTY) in a saved frame.
+    if isinstance(tick, dict):
+        ALL_CLASSES = {name: 0 for name in engine.TYPES}
+        for i in tick.values():
+            ALL_CLASSES[i.__str__()] += 1
+        return ALL_CLASSES
+    counts = np.bincount(tick.ravel(), minlength=len(engine.TYPES))
+    return {name: int(counts[code]) for code, name in enumerate(engine.TYPES)}
 
-class God(Citizen):
-    def __init__(self, position, world, immunity=constants.IMMUNITY["GOD"]):
-        super().__init__(immunity, world)
-        self.immunity = immunity
-        self.position = position
-        self.world = world
-        self.color = constants.COLORS["GOD"]
-        self.generation = 1
 
-    def __str__(self):
-        return "GOD"
+class LiveStopped(Exception):
+    # Raised inside the simulation thread of Board.live_frames once nobody is consuming frames any more.
+    pass
 
-    __repr__ = __str__
 
-    def interact(self, board):
-        all_neighbours = self.find_neighbours()
-        direct_neighbours = [board[i, j] for i, j in all_neighbours["DIRECT"] if
-                             0 < i < self.world.size and 0 < j < self.world.size]
-        # Check if in direct contact with killer
-        for check in direct_neighbours:
-            if isinstance(check, Killer):
-                self.immunity *= constants.KILLER_GOD_IMM_PENALTY
-        for check in direct_neighbours:
-            if isinstance(check, Diseased):
-                self.immunity *= constants.DISEASED_GOD_IMM_PENALTY
+class LiveFrames:
+    # The frames of Board.live_frames. Unlike a generator, closing it stops and joins the simulation thread
+    # even when no frame has been read yet.
+    def __init__(self, frames, stopped, producer):
+        self.frames = frames
+        self.stopped = stopped
+        self.producer = producer
+
+    def __iter__(self):
         return self
 
+    def __next__(self):
+        if self.stopped.is_set():
+            raise StopIteration
+        item = self.frames.get()
+        if item is None:
+            self.close()
+            raise StopIteration
+        if isinstance(item, BaseException):
+            self.close()
+            raise item
+        return item
+
+    def close(self):
+        self.stopped.set()
+        self.producer.join()
+
+    def __del__(self):
+        # Dropped without being closed, let the simulation thread stop on its own.
+        self.stopped.set()
+
 
 class Board:
-    def __init__(self, size, num_spawn, save_path, num_ticks=constants.NUM_TICKS, spawn_probs=constants.SPAWN_PROB):
+    ENGINES = ("object", "numpy", "sparse", "parallel")
+    ARRAY_ENGINES = ("numpy", "sparse", "parallel")
+    # Sequential keeps the in place update order of old runs, not their results (see step).
+    UPDATES = ("synchronous", "sequential")
+    FORMATS = {"pickle": "gol", "binary": "golb", "delta": "gold"}
+
+    def __init__(self, size, num_spawn, save_path, num_ticks=constants.NUM_TICKS, spawn_probs=None,
+                 engine="object", seed=None, update="synchronous", save_format="pickle", save_ages=False,
+                 keyframe_interval=storage.KEYFRAME_INTERVAL, checkpoint_interval=100,
+                 workers=None, rules=None, profile=False, edges="bounded", stop_on=("extinction",),
+                 max_period=8, patience=20):
         print("STARTING COMPUTATION ENGINE...")
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {self.ENGINES}")
+        if update not in self.UPDATES:
+            raise ValueError(f"Unknown update mode {update!r}, expected one of {self.UPDATES}")
+        if engine in self.ARRAY_ENGINES and update == "sequential":
+            raise ValueError(f"The {engine} engine only supports synchronous updates")
+        if edges not in topology.EDGES:
+            raise ValueError(f"Unknown edges {edges!r}, expected one of {topology.EDGES}")
+        if set(stop_on) - set(detection.EVENTS):
+            raise ValueError(f"Unknown events in stop_on {stop_on!r}, expected some of {detection.EVENTS}")
+        if save_format not in self.FORMATS:
+            raise ValueError(f"Unknown save format {save_format!r}, expected one of {tuple(self.FORMATS)}")
         self.size = size
         self.num_spawn = num_spawn
-        self.spawn_probs = spawn_probs
         self.curr_gen = 1
         self.num_ticks = num_ticks
         self.path = save_path
+        self.engine = engine
+        # An unseeded run still gets a seed, so that it can be recorded and reproduced.
+        self.seed = random.SystemRandom().getrandbits(64) if seed is None else seed
+        self.update = update
+        self.save_format = save_format
+        self.save_ages = save_ages
+        self.keyframe_interval = keyframe_interval
+        self.checkpoint_interval = checkpoint_interval
+        self.workers = workers
+        self.edges = edges
+        # The run ends early once one of the stop_on events is detected, see detection.py.
+        self.stop_on = tuple(stop_on)
+        self.max_period = max_period
+        self.patience = patience
+        self.outcome = []
+        self.set_rules(rules)
+        # Without spawn_probs the particles are spawned by the SPAWN_PROB of the rules, overrides included.
+        self.spawn_probs = spawn_probs or self.rules["SPAWN_PROB"]
+        # Instrumentation of the tick loop, see profiling.py. Callbacks are called after every generation.
+        self.profiler = profiling.Profiler() if profile else None
+        self.callbacks = []
+        self.arrays = None
+
+    def __getstate__(self):
+        # Every pickled particle drags its world along, leave the per tick working state out of it.
+        state = self.__dict__.copy()
+        for transient in ("draws", "random", "arrays", "profiler", "callbacks", "tables", "empties"):
+            state.pop(transient, None)
+        return state
+
+    def set_rules(self, rules):
+        # rules are overrides of constants.py (see engine.make_rules), or the path of a rule file to read them from.
+        self.rule_overrides = engine.load_rules(rules) if isinstance(rules, str) else rules
+        self.tables = engine.RuleTables(self.rules)
+
+    @property
+    def rules(self):
+        # The rule set of this board, constants.py with rule_overrides applied.
+        return engine.make_rules(self.rule_overrides)
+
+    @property
+    def topology(self):
+        # The neighbour positions of every cell, shared by all boards of this size and edges.
+        return topology.get(self.size, self.edges)
 
     def first_gen(self):
-        board = {(i, j): Empty(position=(i, j), world=self) for i in range(self.size) for j in range(self.size)}
-        all_spawns = random.choices([(i, j) for i in range(self.size) for j in range(self.size)], k=self.num_spawn)
-        for choice in all_spawns:
-            board[choice] = random.choices([
-                Citizen(position=choice, world=self),
-                Diseased(position=choice, world=self),
-                Killer(position=choice, world=self),
-                God(position=choice, world=self),
-            ], weights=constants.SPAWN_PROB.values(), k=1)[0]
-        return board
-
-    def compute_board_states(self):
-        if not os.path.isfile(f"{self.path}.gol"):
-            print("Computing Board States...")
-            generations = []
-            board = self.first_gen()
-            while self.curr_gen <= self.num_ticks:
-                board_copy = copy.deepcopy(board)
-                for position, particle in board_copy.items():
-                    board_copy[position] = board_copy[position].apply_immunity().enforce_basic_rules(board_copy).interact(board_copy)
-                self.curr_gen += 1
-                board = board_copy
-                generations.append(board)
-            self.save_board(generations)
-            print("Board States Computed!")
+        # The spawns are drawn exactly like the array engines draw them, so a seed gives the same first generation.
+        spawns = engine.ArrayEngine(self.size, self.num_spawn, spawn_probs=self.spawn_probs, seed=self.seed).first_gen()
+        # Particles share the position tuples of the empties instead of each generation making its own.
+        return {position: self.particle(spawns[position], position) for position in self.empties}
+
+    @functools.cached_property
+    def empties(self):
+        # The one Empty of every cell, shared by every generation instead of making a new one whenever a cell empties.
+        return {(i, j): Empty(position=(i, j), world=self) for i in range(self.size) for j in range(self.size)}
+
+    def particle(self, code, position):
+        # A new particle of type code at position, only ever made once its type has been decided.
+        if code == engine.EMPTY:
+            return self.empties[position]
+        return PARTICLES[code](position=position, world=self)
+
+    def draw(self, phase, position):
+        # The uniform draw of a cell for one rule phase (0 immunity, 1 population, 2 interactions) of this tick.
+        return self.draws[phase][position]
+
+    def compute_board_states(self, resume=False):
+        """
+        Computes generations up to num_ticks and streams them into the animation file.
+        With resume=True an existing animation is continued from its last checkpoint instead,
+        which is also how a finished run is extended: raise num_ticks and resume.
+        """
+        checkpoint = None
+        if os.path.isfile(self.save_file()):
+            if not resume:
+                print("File already exists...\n Board state computation aborted.")
+                return
+            checkpoint = self.load_checkpoint()
+            ended = self.ended()
+            if ended:
+                print(f"Run already ended with {ended[0]['Event']} at generation {ended[0]['Generation']}, "
+                      f"nothing to resume.")
+                return
+            print(f"Resuming from generation {checkpoint['Generation']}...")
+        print("Computing Board States...")
+        # Every generation goes to disk as soon as it is computed, so memory stays flat however long the run.
+        # Population counts go to a small statistics index next to it, so plots never have to read the frames.
+        with self.writer(resume=checkpoint["Writer"] if checkpoint else None) as writer, \
+                storage.StatisticsWriter(self.statistics_file(),
+                                         resume=checkpoint["Statistics"] if checkpoint else None) as statistics:
+            detector = detection.SteadyStateDetector(self.max_period, self.patience)
+            self.outcome = list(writer.meta.get("Outcome", [])) if checkpoint else []
+            profiler = self.profiler
+            if profiler:
+                profiler.start()
+            for board in self.generations(checkpoint):
+                if profiler:
+                    profiler.lap("step")
+                writer.write(board, ages=self.arrays.generation if self.arrays else None)
+                if profiler:
+                    profiler.lap("save")
+                statistics.write(board)
+                if profiler:
+                    profiler.lap("statistics")
+                event = detector.observe(self.curr_gen, storage.frame_codes(board))
+                if event:
+                    event = self.record_outcome(event, writer)
+                if profiler:
+                    profiler.lap("detection")
+                checkpointed = self.curr_gen == self.num_ticks or (event and event["Stopped"]) or (
+                    self.checkpoint_interval and self.curr_gen % self.checkpoint_interval == 0)
+                if checkpointed:
+                    self.save_checkpoint(board, writer, statistics)
+                    if profiler:
+                        profiler.lap("checkpoint")
+                try:
+                    for callback in self.callbacks:
+                        callback(self.curr_gen, board)
+                except LiveStopped:
+                    # Nobody watches a live run any more, checkpoint the last saved generation so it can be resumed.
+                    if not checkpointed:
+                        self.save_checkpoint(board, writer, statistics)
+                    print(f"Stopped at generation {self.curr_gen} of {self.num_ticks}, resume to carry on.")
+                    raise
+                if profiler:
+                    profiler.lap("callbacks")
+                    profiler.end_tick(self.curr_gen)
+                if event and event["Stopped"]:
+                    print(f"Stopped at generation {self.curr_gen} of {self.num_ticks}.")
+                    break
+        print("Board States Computed!")
+        if self.profiler:
+            print(self.profiler.report())
+
+    def record_outcome(self, event, writer):
+        # Adds a detected event to the Outcome in the Meta. A resumed run keeps the events it detected before.
+        known = [outcome for outcome in self.outcome if outcome["Event"] == event["Event"]]
+        if known:
+            event = known[0]
         else:
-            print("File already exists...\n Board state computation aborted.")
+            print(f"Generation {event['Generation']}: {event['Event']} since generation {event['Since']}")
+            self.outcome.append(event)
+        event["Stopped"] = event["Event"] in self.stop_on
+        self.update_meta(writer, {"Outcome": self.outcome})
+        return event
+
+    @staticmethod
+    def update_meta(writer, changes):
+        try:
+            writer.update_meta(changes)
+        except ValueError as error:
+            # Animations started before the Meta had room to spare.
+            print(f"Meta not updated with {list(changes)}: {error}")
+
+    def add_callback(self, callback):
+        # callback(generation, board) is called after every generation has been computed and saved.
+        self.callbacks.append(callback)
+
+    def live_frames(self, buffer=8, save=True, resume=False):
+        """
+        Starts computing the generations in a background thread and returns an iterator of their type codes
+        (see LiveFrames), which yields every frame as soon as it is ready.
+        At most buffer frames wait in the queue, so a slow consumer holds the simulation back instead of
+        letting memory grow. With save=True the run is also written to disk (and checkpointed) as usual.
+        Closing the iterator stops the simulation, read from or not, a saved run can then be carried on with resume,
+        which only yields the generations after its checkpoint.
+        """
+        frames = queue.Queue(maxsize=buffer)
+        stopped = threading.Event()
+
+        def offer(item):
+            while not stopped.is_set():
+                try:
+                    frames.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    pass
+            raise LiveStopped()
+
+        def publish(generation, board):
+            # The engines overwrite their buffers as they step, so the queue gets a copy of every frame.
+            offer(np.array(storage.frame_codes(board)))
+
+        def produce():
+            try:
+                if save:
+                    self.add_callback(publish)
+                    self.compute_board_states(resume=resume)
+                else:
+                    for board in self.generations():
+                        publish(self.curr_gen, board)
+                offer(None)
+            except LiveStopped:
+                pass
+            except BaseException as error:
+                # Handed over to the consumer, which raises it in the main thread.
+                try:
+                    offer(error)
+                except LiveStopped:
+                    pass
+            finally:
+                if publish in self.callbacks:
+                    self.callbacks.remove(publish)
+
+        producer = threading.Thread(target=produce, name="simulation", daemon=True)
+        producer.start()
+        return LiveFrames(frames, stopped, producer)
+
+    def checkpoint_file(self):
+        return f"{self.path}.golc"
+
+    def unfinished(self):
+        # How many generations a saved run has when it was stopped short of num_ticks, None when it is complete.
+        if not os.path.isfile(self.checkpoint_file()):
+            return None
+        checkpoint = self.load_checkpoint()
+        if checkpoint["Generation"] >= self.num_ticks or self.ended():
+            return None
+        return checkpoint["Writer"]["count"]
+
+    def ended(self):
+        # The events a saved run stopped on that still end it, those no longer in stop_on let it be resumed.
+        # Read from the file this board writes, a copy in another format may not have its latest Meta.
+        outcome = storage.open_file(self.save_file()).meta.get("Outcome", [])
+        return [event for event in outcome if event.get("Stopped") and event["Event"] in self.stop_on]
+
+    def statistics_file(self):
+        return f"{self.path}.gols"
+
+    def save_checkpoint(self, board, writer, statistics):
+        # Everything needed to carry on exactly where we are: the state of every particle, the seed
+        # and where the animation file and the statistics index end.
+        # Random draws only depend on the seed and the tick, so the seed is all there is to save of them.
+        # The Meta is brought up to date with it, so a stopped, resumed or extended run tells how far it got.
+        self.update_meta(writer, {"No. of generations computed": writer.count, "Target Ticks": self.num_ticks})
+        checkpoint = {
+            "Generation": self.curr_gen,
+            "Engine": self.engine,
+            "Format": self.save_format,
+            "Board": self.arrays.state() if self.engine in self.ARRAY_ENGINES else board,
+            "Seed": self.seed,
+            "Edges": self.edges,
+            # The configuration the run was started with, which a resumed run carries on with (see load_checkpoint).
+            "Size": self.size,
+            "Spawned": self.num_spawn,
+            "Spawn Probs": self.spawn_probs,
+            "Rules": self.rule_overrides,
+            "Update": self.update,
+            "Writer": writer.position(),
+            "Statistics": statistics.position(),
+        }
+        # Write next to the old checkpoint and swap, so a crash never leaves us with half a checkpoint.
+        with open(f"{self.checkpoint_file()}.tmp", "wb") as f:
+            pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{self.checkpoint_file()}.tmp", self.checkpoint_file())
+
+    def load_checkpoint(self):
+        if not os.path.isfile(self.checkpoint_file()):
+            raise FileNotFoundError(f"No checkpoint to resume {self.save_file()} from")
+        with open(self.checkpoint_file(), "rb") as f:
+            checkpoint = pickle.load(f)
+        if (checkpoint["Engine"], checkpoint["Format"]) != (self.engine, self.save_format):
+            raise ValueError(f"Checkpoint was written by the {checkpoint['Engine']} engine in {checkpoint['Format']} "
+                             f"format, not the {self.engine} engine in {self.save_format} format")
+        if checkpoint.get("Edges", "bounded") != self.edges:
+            raise ValueError(f"Checkpoint was written with {checkpoint['Edges']} edges, not {self.edges}")
+        self.seed = checkpoint["Seed"]
+        self.adopt(checkpoint)
+        return checkpoint
+
+    def adopt(self, checkpoint):
+        # A run is carried on with the board and rules it was started with, whatever this Board was made with,
+        # so that resuming never needs the original options repeated. Older checkpoints did not record them.
+        config = {"size": checkpoint.get("Size", self.size), "num_spawn": checkpoint.get("Spawned", self.num_spawn),
+                  "spawn_probs": checkpoint.get("Spawn Probs", self.spawn_probs),
+                  "rule_overrides": checkpoint.get("Rules", self.rule_overrides),
+                  "update": checkpoint.get("Update", self.update)}
+        changed = [name for name, value in config.items() if getattr(self, name) != value]
+        if not changed:
+            return
+        print(f"Carrying on with the {', '.join(changed)} of the checkpoint")
+        self.size, self.num_spawn, self.spawn_probs, self.update = (
+            config["size"], config["num_spawn"], config["spawn_probs"], config["update"])
+        self.set_rules(config["rule_overrides"])
+        # The empties are made for the size of the board.
+        self.__dict__.pop("empties", None)
+
+    def save_file(self):
+        return f"{self.path}.{self.FORMATS[self.save_format]}"
+
+    def writer(self, resume=None):
+        if self.save_format == "binary":
+            return storage.BinaryWriter(self.save_file(), self.meta(), self.size, ages=self.save_ages, resume=resume)
+        if self.save_format == "delta":
+            return storage.DeltaWriter(self.save_file(), self.meta(), self.size,
+                                       keyframe_interval=self.keyframe_interval, resume=resume)
+        return storage.AnimationWriter(self.save_file(), self.meta(), resume=resume)
+
+    def generations(self, checkpoint=None):
+        """
+        Yields every generation from 1 (or the one after checkpoint) to num_ticks as it is computed.
+        Frames are the buffers being stepped and are overwritten by later ticks, keep storage.frame_codes
+        of a frame (copied) if you need it around. Copying an object engine frame with dict does not do:
+        surviving particles are shared by both buffers and their ages and immunity change on the very next tick.
+        """
+        if checkpoint:
+            self.curr_gen = checkpoint["Generation"] + 1
+        self.random = engine.CounterRandom(self.seed)
+        if self.engine in self.ARRAY_ENGINES:
+            # Frames are arrays of type codes (see engine.TYPES) instead of dicts of particles.
+            if self.engine == "parallel":
+                self.arrays = parallel.TiledEngine(self.size, self.num_spawn, spawn_probs=self.spawn_probs,
+                                                   seed=self.seed, rules=self.rules, edges=self.edges,
+                                                   workers=self.workers)
+            else:
+                engine_class = engine.SparseEngine if self.engine == "sparse" else engine.ArrayEngine
+                self.arrays = engine_class(self.size, self.num_spawn, spawn_probs=self.spawn_probs,
+                                           seed=self.seed, rules=self.rules, edges=self.edges)
+            self.arrays.profiler = self.profiler
+            if checkpoint:
+                self.arrays.restore(checkpoint["Board"])
+            else:
+                self.arrays.first_gen()
+            try:
+                while self.curr_gen <= self.num_ticks:
+                    yield self.arrays.step()
+                    self.curr_gen += 1
+            finally:
+                if self.engine == "parallel":
+                    self.arrays.close()
+            return
+        if checkpoint:
+            board = checkpoint["Board"]
+            for particle in board.values():
+                particle.world = self
+        else:
+            board = self.first_gen()
+        spare = dict(board)
+        while self.curr_gen <= self.num_ticks:
+            following = self.step(board, spare)
+            # The buffer we just read from becomes the one we write the next generation into.
+            spare, board = board, following
+            yield board
+            self.curr_gen += 1
+
+    def step(self, board, following):
+        """
+        Computes the next generation of the object engine.
+        Synchronous updates read every neighbour from board and write the result into following,
+        so no cell ever sees a neighbour that has already moved on to the next generation.
+        Sequential updates write straight back into board,
+        so cells later in iteration order see their already updated neighbours.
+        Neither reproduces .gol files computed before the neighbourhood fixes and seeded draws,
+        those read the wrong neighbours on row and column 0 and drew from the unseeded random module.
+        """
+        # One bulk draw per rule phase for the whole board, from the same streams the array engines use.
+        self.draws = self.random.uniform(self.curr_gen - 1, self.size, 0, self.size)
+        if self.profiler:
+            return self.profiled_step(board, following)
+        if self.update == "sequential":
+            for position in board:
+                board[position] = board[position].apply_immunity().enforce_basic_rules(board).interact(board)
+            return board
+        for position, particle in board.items():
+            following[position] = particle.apply_immunity().enforce_basic_rules(board).interact(board)
+        return following
+
+    def profiled_step(self, board, following):
+        # Board.step with every rule phase timed and every rule firing counted, only used while profiling.
+        profiler, clock = self.profiler, time.perf_counter
+        target = board if self.update == "sequential" else following
+        timings = {"immunity": 0.0, "population": 0.0, "interactions": 0.0}
+        for position, particle in board.items():
+            started = clock()
+            aged = particle.apply_immunity()
+            immune = clock()
+            survivor = aged.enforce_basic_rules(board)
+            populated = clock()
+            result = survivor.interact(board)
+            interacted = clock()
+            timings["immunity"] += immune - started
+            timings["population"] += populated - immune
+            timings["interactions"] += interacted - populated
+            before, aged_name, survivor_name, after = (
+                particle.__str__(), aged.__str__(), survivor.__str__(), result.__str__())
+            if before != "EMPTY" and aged_name == "EMPTY":
+                profiler.count("immunity deaths", 1)
+            if aged_name != "EMPTY" and survivor_name == "EMPTY":
+                profiler.count("population deaths", 1)
+            if survivor_name == "EMPTY" and after != "EMPTY":
+                profiler.count("births", 1)
+            elif survivor_name != "EMPTY" and after == "EMPTY":
+                profiler.count("kills", 1)
+            elif survivor_name != after:
+                profiler.count("transformations", 1)
+            target[position] = result
+        for phase, seconds in timings.items():
+            profiler.add(phase, seconds)
+        return target
+
+    def meta(self):
+        rules = self.rules
+        return {
+            "Animation": self.path,
+            "Engine": self.engine,
+            "Update": self.update,
+            "Edges": self.edges,
+            "Stop On": list(self.stop_on),
+            "Seed": self.seed,
+            "Grid Size": self.size,
+            "Spawned Elements": self.num_spawn,
+            # Kept up to date at every checkpoint, see save_checkpoint.
+            "No. of generations computed": 0,
+            "Target Ticks": self.num_ticks,
+            "Spawning Probabilities": self.spawn_probs,
+            "Immunity": rules["IMMUNITY"],
+            "Reproduction Spawn Probability": rules["REPRO_SPAWN"],
+            "Over Population Mortality": rules["MORTALITY_OP"],
+            "Under Population Mortality": rules["MORTALITY_UP"],
+            "Killer Kill Rate": rules["KILLER_KILL_RATE"],
+            "God Kill Rate": rules["GOD_KILL_RATE"],
+            "God Transform Rate": rules["GOD_TRANSFORM_RATE"],
+            "Killer Transform Rate": rules["KILLER_TRANSFORM_RATE"],
+            "Penalty on god when touching killer": rules["KILLER_GOD_IMM_PENALTY"],
+            "Penalty on god when touching Diseased": rules["DISEASED_GOD_IMM_PENALTY"],
+            "Interactions": rules["INTERACTIONS"],
+        }
 
     def save_board(self, generations):
-        with open(f"{self.path}.gol", "wb") as f:
-            data = {
-                "Meta": {
-                    "Animation": self.path,
-                    "Grid Size": self.size,
-                    "Spawned Elements": self.num_spawn,
-                    "No. of generations computed": self.num_ticks,
-                    "Spawning Probabilities": constants.SPAWN_PROB,
-                    "Immunity": constants.IMMUNITY,
-                    "Reproduction Spawn Probability": constants.REPRO_SPAWN,
-                    "Over Population Mortality": constants.MORTALITY_OP,
-                    "Under Population Mortality": constants.MORTALITY_UP,
-                    "Killer Kill Rate": constants.KILLER_KILL_RATE,
-                    "God Kill Rate": constants.GOD_KILL_RATE,
-                    "God Transform Rate": constants.GOD_TRANSFORM_RATE,
-                    "Killer Transform Rate": constants.KILLER_TRANSFORM_RATE,
-                    "Penalty on god when touching killer": constants.KILLER_GOD_IMM_PENALTY,
-                    "Penalty on god when touching Diseased": constants.DISEASED_GOD_IMM_PENALTY,
-
-                },
-                "Animation": generations
-            }
-            pickle.dump(data, f)
+        with self.writer() as writer:
+            for board in generations:
+                writer.write(board)
+            self.update_meta(writer, {"No. of generations computed": writer.count})
 
 
 class Animator:
-    def __init__(self, width, height, title, world, sleep=0, start=0, cut=None):
+    def __init__(self, width, height, title, world, sleep=0, start=0, cut=None, fps=None):
         print("STARTING ANIMATION ENGINE...")
         self.width = width
         self.height = height
@@ -389,52 +741,70 @@ class Animator:
         self.sleep = sleep
         self.cut = cut
         self.start = start
+        # With a target fps, frames are shown on a fixed schedule and skipped when drawing falls behind it,
+        # instead of sleeping for sleep seconds after every frame.
+        self.fps = fps
 
     def load_world(self):
-        with open(f"{self.world.path}.gol", "rb") as f:
-            return pickle.load(f)
-
-    def animate(self):
-        print("Loading Animation Data...")
-        data = self.load_world()
-        print("Data Loaded from file!")
-        if isinstance(data, dict):
-            print(json.dumps(data["Meta"], indent=2))
-            data = data["Animation"]
-        wn = turtle.Screen()
-        wn.title(self.title)
-        wn.bgcolor("black")
-        wn.setup(700, 700)
-        wn.tracer(0)
-        stamper = turtle.Turtle()
-        stamper.shape("square")
-        stamper.shapesize(self.width / (self.world.size * 20) - 4 / self.world.size, self.width / (self.world.size * 20) - 4 / self.world.size, 0)
-        stamper.penup()
-        writer = turtle.Turtle()
-        writer.hideturtle()
-        writer.goto(0, 0)
-        writer.pencolor("crimson")
-        writer.write("THE GAME OF LIFE", align="center", font=("chiller", 50, "normal"))
-        time.sleep(4)
-        writer.goto(0, -30)
-        writer.write("A Kiss of Death💋", align="center", font=("chiller", 30, "normal"))
-        time.sleep(3)
-        writer.clear()
-        x, y = -self.width / 2, self.height / 2
-        data = data[self.start:]
-        if self.cut:
-            data = data[:self.cut]
-        for tick in data:
-            for location, entity in tick.items():
-                if not isinstance(entity, Empty):
-                    i, j = location
-                    stamper.goto(x + (i + 1) * self.width / self.world.size - self.height / (self.world.size * 2),
-                                 y - (j + 1) * self.width / self.world.size - self.height / (self.world.size * 2))
-                    stamper.color(entity.color)
-                    stamper.stamp()
-            wn.update()
-            time.sleep(self.sleep)
-            stamper.clear()
+        return storage.open_animation(self.world.path)
+
+    def animate(self, live=False, save=True, buffer=8):
+        """
+        Plays the saved animation of world.
+        With live=True the world is simulated while it is being played instead (see Board.live_frames),
+        so the first frame shows up as soon as it is computed. A run that is already saved is played from disk.
+        """
+        saved = None
+        if live and save and os.path.isfile(self.world.save_file()):
+            saved = self.world.unfinished()
+            if saved is None:
+                print("Animation already computed, playing it from disk...")
+                live = False
+            else:
+                print(f"Animation stopped at generation {saved}, playing it from disk and carrying on from there...")
+        if live:
+            # The simulation gets going right away and fills the buffer while the title is shown.
+            meta = self.world.meta()
+            stream = self.world.live_frames(buffer=buffer, save=save, resume=saved is not None)
+        try:
+            if live:
+                frames = stream
+                if saved is not None:
+                    # Resuming only rewrites what comes after the checkpoint,
+                    # the frames before it can be read meanwhile.
+                    frames = itertools.chain(self.load_world().frames(0, saved), stream)
+                frames = itertools.islice(frames, self.start, self.start + self.cut if self.cut else None)
+            else:
+                print("Loading Animation Data...")
+                reader = self.load_world()
+                print("Data Loaded from file!")
+                meta = reader.meta
+                frames = reader.frames(self.start, self.start + self.cut if self.cut else None)
+            if meta:
+                print(json.dumps(meta, indent=2))
+            # Loaded here so that computing never needs Tk, only showing does.
+            import turtle
+            wn = turtle.Screen()
+            wn.title(self.title)
+            wn.bgcolor("black")
+            wn.setup(700, 700)
+            wn.tracer(0)
+            writer = turtle.Turtle()
+            writer.hideturtle()
+            writer.goto(0, 0)
+            writer.pencolor("crimson")
+            writer.write("THE GAME OF LIFE", align="center", font=("chiller", 50, "normal"))
+            time.sleep(4)
+            writer.goto(0, -30)
+            writer.write("A Kiss of Death💋", align="center", font=("chiller", 30, "normal"))
+            time.sleep(3)
+            writer.clear()
+            self.play(frames, wn)
+        finally:
+            if live:
+                # Stops a live simulation that is still going after the cut, when the window is closed
+                # (even during the title) or when anything else goes wrong before the last frame.
+                stream.close()
         time.sleep(2)
         writer.goto(0, -120)
         writer.write("💀", align="center", font=("chiller", 180, "normal"))
@@ -442,67 +812,97 @@ class Animator:
         writer.clear()
         wn.bye()
 
+    def play(self, frames, wn):
+        """
+        Every cell is one rectangle on the turtle canvas, made the first time the cell holds a particle.
+        Only cells whose particle type changed since the last frame shown are recoloured (or hidden once empty).
+        Stamps would be cleared with turtle's clearstamp instead, which searches every stamp on the screen.
+        """
+        size = self.world.size
+        canvas = wn.getcanvas()
+        x, y = -self.width / 2, self.height / 2
+        # Canvas coordinates of the centre of every row and column (the canvas y axis points down),
+        # worked out once for the whole animation, and half the side of a cell as the old square stamps had it.
+        xs = [x + (i + 1) * self.width / size - self.height / (size * 2) for i in range(size)]
+        ys = [-(y - (j + 1) * self.width / size - self.height / (size * 2)) for j in range(size)]
+        half = 10 * (self.width / (size * 20) - 4 / size)
+        colors = [constants.COLORS[name] for name in engine.TYPES]
+        cells = {}
+        shown = np.zeros((size, size), dtype=np.uint8)
+        started = time.perf_counter()
+        for index, tick in enumerate(frames):
+            if self.fps:
+                now = time.perf_counter()
+                if now >= started + (index + 1) / self.fps:
+                    # Already late for the next frame, drop this one to keep up with the clock.
+                    continue
+                time.sleep(max(started + index / self.fps - now, 0))
+            codes = storage.frame_codes(tick)
+            for i, j in zip(*np.nonzero(codes != shown)):
+                if not codes[i, j]:
+                    canvas.itemconfig(cells[i, j], state="hidden")
+                elif (i, j) in cells:
+                    canvas.itemconfig(cells[i, j], fill=colors[codes[i, j]], state="normal")
+                else:
+                    cells[i, j] = canvas.create_rectangle(xs[i] - half, ys[j] - half, xs[i] + half, ys[j] + half,
+                                                          fill=colors[codes[i, j]], outline="")
+            shown = codes.copy()
+            wn.update()
+            if not self.fps:
+                time.sleep(self.sleep)
+        canvas.delete(*cells.values())
+
 
 class StatisticGenerator:
-    def __init__(self, animation_path, start=0, cut=None, save_path=None):
+    def __init__(self, animation_path, start=0, cut=None, save_path=None, region=None):
         print("STARTING STATISTICS ENGINE...")
         self.animation_path = animation_path
         self.cut = cut
         self.start = start
         self.save_path = save_path
+        # (top, left, bottom, right) -- only count the particles in these rows and columns of the board.
+        self.region = region
 
     def load_world(self):
-        with open(f"{self.animation_path}.gol", "rb") as f:
-            return pickle.load(f)
+        return storage.open_animation(self.animation_path)
 
     def compute_statistics(self):
         print("Loading Data...")
-        data = self.load_world()
+        stop = self.start + self.cut + 1 if self.cut else None
+        copy = storage.current_time_major(self.animation_path) if self.region else None
+        if copy:
+            # The time-major copy (see storage.convert_to_time_major) reads the region without touching whole frames.
+            counts = copy.population(*self.region, self.start, stop)
+            ticks = ({name: int(count[code]) for code, name in enumerate(engine.TYPES)} for count in counts)
+        elif self.region:
+            top, left, bottom, right = self.region
+            ticks = (frame_counts(storage.frame_codes(tick)[top:bottom, left:right])
+                     for tick in self.load_world().frames(self.start, stop))
+        elif os.path.isfile(f"{self.animation_path}.gols"):
+            # The statistics index written during the simulation already has the counts.
+            ticks = storage.read_statistics(f"{self.animation_path}.gols", self.start, stop)
+        else:
+            # Frames are read one at a time, the animation is never held in memory as a whole.
+            ticks = (frame_counts(tick) for tick in self.load_world().frames(self.start, stop))
         print("Data Load Completed")
         # Right now I am just counting the number of people in each species.
-        if isinstance(data, dict):
-            data = data["Animation"]
-        data = data[self.start:]
-        if self.cut:
-            data = data[:self.cut + 1]
-        NUM_GEN = len(data)
-        FRAME_STATS = {
-            "CITIZEN": {
-                "GENERATIONS": [i for i in range(NUM_GEN)],
-                "POPULATION": []
-            },
-            "KILLER": {
-                "GENERATIONS": [i for i in range(NUM_GEN)],
-                "POPULATION": []
-            },
-            "GOD": {
-                "GENERATIONS": [i for i in range(NUM_GEN)],
-                "POPULATION": []
-            },
-            "DISEASED": {
-                "GENERATIONS": [i for i in range(NUM_GEN)],
-                "POPULATION": []
-            },
-            "EMPTY": {
-                "GENERATIONS": [i for i in range(NUM_GEN)],
-                "POPULATION": []
-            },
-        }
-        for tick in data:
-            ALL_CLASSES = {
-                "CITIZEN": 0,
-                "KILLER": 0,
-                "GOD": 0,
-                "DISEASED": 0,
-                "EMPTY": 0,
-            }
-            for i in tick.values():
-                ALL_CLASSES[i.__str__()] += 1
-            for j in ALL_CLASSES.keys():
+        FRAME_STATS = {name: {"GENERATIONS": [], "POPULATION": []} for name in engine.TYPES}
+        for generation, ALL_CLASSES in enumerate(ticks):
+            for j in engine.TYPES:
+                FRAME_STATS[j]["GENERATIONS"].append(generation)
                 FRAME_STATS[j]["POPULATION"].append(ALL_CLASSES[j])
         return FRAME_STATS
 
-    def plot_statistics(self):
+    def compute_spatial_statistics(self, workers=1, chunk=100, save_path=None):
+        # Clusters, ages, events and contacts of every generation as a columnar table, see analytics.py.
+        stop = self.start + self.cut + 1 if self.cut else None
+        return analytics.analyse(self.animation_path, self.start, stop, workers=workers, chunk=chunk,
+                                 save_path=save_path)
+
+    @staticmethod
+    def set_theme():
+        # The plotting packages take seconds to import, only pay for them when plotting.
+        import seaborn as sns
         sns.set_theme(style="darkgrid")
         sns.set(rc={
             'axes.facecolor': 'black',
@@ -513,6 +913,13 @@ class StatisticGenerator:
             'ytick.color': 'white',
             'axes.labelcolor': 'white',
         })
+        return sns
+
+    def plot_statistics(self):
+        if os.path.isfile(f"{self.animation_path}.gole"):
+            return self.plot_ensemble()
+        sns = self.set_theme()
+        import matplotlib.pyplot as plt
         data = self.compute_statistics()
         print("statistics computed")
         sns.lineplot(data=data["KILLER"], x="GENERATIONS", y="POPULATION", color=constants.COLORS["KILLER"])
@@ -520,7 +927,30 @@ class StatisticGenerator:
         sns.lineplot(data=data["CITIZEN"], x="GENERATIONS", y="POPULATION", color="green")
         sns.lineplot(data=data["DISEASED"], x="GENERATIONS", y="POPULATION", color=constants.COLORS["DISEASED"])
         plt.legend(labels=['KILLER', 'GOD', 'CITIZEN', 'DISEASED'])
-        plt.title(self.animation_path)
+        plt.title(f"{self.animation_path}, region {self.region}" if self.region else self.animation_path)
+        if self.save_path:
+            plt.savefig(self.save_path)
+        plt.show()
+
+    def plot_ensemble(self, percentiles=(5, 95)):
+        # The mean population of every particle type over the replicates of an ensemble (see ensemble.py),
+        # with the band between the given percentiles around it.
+        self.set_theme()
+        import matplotlib.pyplot as plt
+        print("Loading Data...")
+        runs = ensemble.Ensemble.load(self.animation_path)
+        print("Data Load Completed")
+        stop = self.start + self.cut + 1 if self.cut else None
+        for name, color in (("KILLER", constants.COLORS["KILLER"]), ("GOD", constants.COLORS["GOD"]),
+                            ("CITIZEN", "green"), ("DISEASED", constants.COLORS["DISEASED"])):
+            mean, low, high = runs.band(name, percentiles, self.start, stop)
+            generations = np.arange(len(mean))
+            plt.plot(generations, mean, color=color, label=name)
+            plt.fill_between(generations, low, high, color=color, alpha=0.25)
+        plt.xlabel("GENERATIONS")
+        plt.ylabel("POPULATION")
+        plt.legend()
+        plt.title(f"{self.animation_path}, {len(runs)} runs, {percentiles[0]}-{percentiles[1]} percentiles")
         if self.save_path:
             plt.savefig(self.save_path)
         plt.show()
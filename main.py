@@ -1,29 +1,174 @@
+"""
+Command line entry point of the game of life--
+    python main.py compute Animations/100/A_Clash_of_Clans --size 100 --spawn 3000 --ticks 1000
+    python main.py animate Animations/100/A_Clash_of_Clans [--live] [--fps 30]
+    python main.py stats Animations/30/Free_Will [--save Plots/Animations_30_Free_Will]
+    python main.py analyse Animations/30/Free_Will Tables/Free_Will.csv [--workers 4] (clusters, ages, events...)
+    python main.py transpose Animations/30/Free_Will (then stats --region 0 0 10 10 reads cell histories)
+    python main.py ensemble Ensembles/100/A_Clash_of_Clans --replicates 64 (then stats plots its percentile bands)
+Paths are given without their extension, every format has its own (see Board.FORMATS).
+Computing never imports the plotting or GUI packages, so it works on headless machines.
+"""
+import argparse
+import constants
+import detection
+import ensemble
+import storage
+import topology
 import game_of_life
 
-board = game_of_life.Board(
-    size=100,
-    num_spawn=3000,
-    save_path="Animations/100/A_Clash_of_Clans.gol",
-    num_ticks=1000
-)
-board.compute_board_states()
-animator = game_of_life.Animator(
-    width=600,
-    height=600,
-    title="Game of Life",
-    world=board,
-    sleep=0,
-    start=0,
-    cut=5000,
-)
-animator.animate()
-# stat = game_of_life.StatisticGenerator(
-#     animation_path="Animations/30/Free_Will",
-#     start=0,
-#     cut=None,
-#     save_path="Plots/Animations_30_Free_Will"
-# )
-# stat.plot_statistics()
+
+def make_board(args):
+    return game_of_life.Board(
+        size=args.size,
+        num_spawn=args.spawn,
+        save_path=args.path,
+        num_ticks=args.ticks,
+        engine=args.engine,
+        seed=args.seed,
+        update=args.update,
+        save_format=args.format,
+        save_ages=args.ages,
+        workers=args.workers,
+        rules=args.rules,
+        profile=args.profile,
+        edges=args.edges,
+        stop_on=args.stop_on,
+    )
+
+
+def compute(args):
+    make_board(args).compute_board_states(resume=args.resume)
+
+
+def animate(args):
+    if not args.live:
+        # A computed run knows its own grid size.
+        args.size = storage.open_animation(args.path).meta.get("Grid Size", args.size)
+    animator = game_of_life.Animator(
+        width=args.width,
+        height=args.height,
+        title=args.title,
+        world=make_board(args),
+        sleep=args.sleep,
+        start=args.start,
+        cut=args.cut,
+        fps=args.fps,
+    )
+    animator.animate(live=args.live, save=not args.no_save)
+
+
+def run_ensemble(args):
+    ensemble.run_ensemble(
+        size=args.size,
+        num_spawn=args.spawn,
+        num_ticks=args.ticks,
+        replicates=args.replicates,
+        seed=args.seed,
+        rules=args.rules,
+        edges=args.edges,
+        batch=args.batch,
+        workers=args.workers,
+        save_path=args.path,
+    )
+
+
+def stats(args):
+    stat = game_of_life.StatisticGenerator(
+        animation_path=args.path,
+        start=args.start,
+        cut=args.cut,
+        save_path=args.save,
+        region=args.region,
+    )
+    stat.plot_statistics()
+
+
+def transpose(args):
+    print(f"Time-major copy written to {storage.convert_to_time_major(args.path, ages=not args.no_ages)}")
+
+
+def analyse(args):
+    stat = game_of_life.StatisticGenerator(animation_path=args.path, start=args.start, cut=args.cut)
+    stat.compute_spatial_statistics(workers=args.workers, chunk=args.chunk, save_path=args.output)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    board = argparse.ArgumentParser(add_help=False)
+    board.add_argument("path", help="where the animation is saved, without extension")
+    board.add_argument("--size", type=int, default=100)
+    board.add_argument("--spawn", type=int, default=3000, help="number of particles spawned")
+    board.add_argument("--ticks", type=int, default=constants.NUM_TICKS)
+    board.add_argument("--engine", choices=game_of_life.Board.ENGINES, default="object")
+    board.add_argument("--seed", type=int, default=None)
+    board.add_argument("--update", choices=game_of_life.Board.UPDATES, default="synchronous")
+    board.add_argument("--format", choices=tuple(game_of_life.Board.FORMATS), default="pickle")
+    board.add_argument("--ages", action="store_true", help="keep particle ages in binary files")
+    board.add_argument("--edges", choices=topology.EDGES, default="bounded")
+    board.add_argument("--rules", default=None, help="a .json or .toml rule file (see engine.load_rules)")
+    board.add_argument("--workers", type=int, default=None, help="worker processes of the parallel engine")
+    board.add_argument("--stop-on", nargs="*", choices=detection.EVENTS, default=["extinction"])
+    board.add_argument("--profile", action="store_true")
+
+    compute_parser = commands.add_parser("compute", parents=[board], help="simulate and save a run")
+    compute_parser.add_argument("--resume", action="store_true",
+                                help="carry on from the last checkpoint, with the board and rules it was started with")
+    compute_parser.set_defaults(run=compute)
+
+    window = argparse.ArgumentParser(add_help=False)
+    window.add_argument("--start", type=int, default=0)
+    window.add_argument("--cut", type=int, default=None, help="number of generations to use")
+
+    animate_parser = commands.add_parser("animate", parents=[board, window], help="play a run")
+    animate_parser.add_argument("--live", action="store_true", help="simulate while playing")
+    animate_parser.add_argument("--no-save", action="store_true", help="do not save a live run")
+    animate_parser.add_argument("--width", type=int, default=600)
+    animate_parser.add_argument("--height", type=int, default=600)
+    animate_parser.add_argument("--title", default="Game of Life")
+    animate_parser.add_argument("--sleep", type=float, default=0)
+    animate_parser.add_argument("--fps", type=float, default=None)
+    animate_parser.set_defaults(run=animate)
+
+    stats_parser = commands.add_parser("stats", parents=[window], help="plot the population of a run")
+    stats_parser.add_argument("path", help="where the animation is saved, without extension")
+    stats_parser.add_argument("--save", default=None, help="also save the plot to this file")
+    stats_parser.add_argument("--region", type=int, nargs=4, default=None, metavar=("TOP", "LEFT", "BOTTOM", "RIGHT"),
+                              help="only count the particles in these rows and columns")
+    stats_parser.set_defaults(run=stats)
+
+    analyse_parser = commands.add_parser("analyse", parents=[window], help="tabulate the spatial statistics of a run")
+    analyse_parser.add_argument("path", help="where the animation is saved, without extension")
+    analyse_parser.add_argument("output", help="a .csv, .parquet or .npz file to write the table to")
+    analyse_parser.add_argument("--workers", type=int, default=1)
+    analyse_parser.add_argument("--chunk", type=int, default=100, help="generations per worker task")
+    analyse_parser.set_defaults(run=analyse)
+
+    transpose_parser = commands.add_parser("transpose", help="write the time-major copy of a run, for cell histories")
+    transpose_parser.add_argument("path", help="where the animation is saved, without extension")
+    transpose_parser.add_argument("--no-ages", action="store_true", help="leave the ages out")
+    transpose_parser.set_defaults(run=transpose)
+
+    ensemble_parser = commands.add_parser("ensemble", help="simulate many runs and keep their populations")
+    ensemble_parser.add_argument("path", help="where the populations are saved, without extension")
+    ensemble_parser.add_argument("--replicates", type=int, default=32)
+    ensemble_parser.add_argument("--size", type=int, default=100)
+    ensemble_parser.add_argument("--spawn", type=int, default=3000, help="number of particles spawned")
+    ensemble_parser.add_argument("--ticks", type=int, default=constants.NUM_TICKS)
+    ensemble_parser.add_argument("--seed", type=int, default=None)
+    ensemble_parser.add_argument("--edges", choices=topology.EDGES, default="bounded")
+    ensemble_parser.add_argument("--rules", default=None, help="a .json or .toml rule file (see engine.load_rules)")
+    ensemble_parser.add_argument("--batch", type=int, default=None, help="replicates stepped together")
+    ensemble_parser.add_argument("--workers", type=int, default=None)
+    ensemble_parser.set_defaults(run=run_ensemble)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    arguments = parse_args()
+    arguments.run(arguments)
 
 # A Clash of clans is like the best.
 # Gods or killers is like the second best up till now!
@@ -0,0 +1,138 @@
+"""
+Multi-core engine for large boards.
+The board is cut into horizontal stripes and every stripe is advanced by a worker process.
+    1. The particle arrays live in shared memory, the workers read and write them in place,
+       so nothing but a few numbers is sent to a worker per tick.
+    2. Particle types are double buffered. A stripe reads its own rows plus one halo row from each
+       neighbouring stripe out of the current buffer and writes its rows into the other one.
+    3. Random draws come from engine.CounterRandom, so a stripe draws exactly the numbers the single process
+       engine would have drawn for its cells, and results match engine.ArrayEngine bit for bit for the same seed.
+"""
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import engine
+
+# The shared arrays of the board, as seen from inside a worker process.
+WORKER = {}
+
+
+def attach(names, size, rules):
+    blocks = [shared_memory.SharedMemory(name=name) for name in names]
+    WORKER["blocks"] = blocks
+    WORKER["rules"] = rules
+    WORKER["size"] = size
+    WORKER["types"] = [np.ndarray((size, size), dtype=np.uint8, buffer=block.buf) for block in blocks[:2]]
+    WORKER["generation"] = np.ndarray((size, size), dtype=np.uint32, buffer=blocks[2].buf)
+    WORKER["immunity"] = np.ndarray((size, size), dtype=np.float64, buffer=blocks[3].buf)
+
+
+def step_stripe(tick, first_row, last_row):
+    size, rules = WORKER["size"], WORKER["rules"]
+    current, following = WORKER["types"][tick % 2], WORKER["types"][(tick + 1) % 2]
+    draws = rules.random.uniform(tick, size, first_row, last_row)
+    if rules.topology.wrap:
+        # The halo rows of the first and last stripe come from the other end of the board.
+        window = current.take(range(first_row - 1, last_row + 1), axis=0, mode="wrap")
+        top, bottom = first_row - 1, last_row + 1
+    else:
+        # One halo row on either side, unless the stripe is on the edge of the board.
+        top, bottom = max(first_row - 1, 0), min(last_row + 1, size)
+        window = current[top:bottom]
+    following[first_row:last_row] = rules.advance(
+        window,
+        WORKER["generation"][first_row:last_row],
+        WORKER["immunity"][first_row:last_row],
+        draws, top=first_row - top, bottom=bottom - last_row,
+    )
+
+
+class TiledEngine(engine.ArrayEngine):
+    def __init__(self, size, num_spawn, spawn_probs=None, seed=None, rules=None, edges="bounded", workers=None,
+                 stripes=None):
+        self.workers = workers or os.cpu_count()
+        self.blocks = [
+            shared_memory.SharedMemory(create=True, size=max(size * size * itemsize, 1))
+            for itemsize in (1, 1, 4, 8)
+        ]
+        self.buffers = [np.ndarray((size, size), dtype=np.uint8, buffer=block.buf) for block in self.blocks[:2]]
+        super().__init__(size, num_spawn, spawn_probs=spawn_probs, seed=seed, rules=rules, edges=edges)
+        self.generation = np.ndarray((size, size), dtype=np.uint32, buffer=self.blocks[2].buf)
+        self.immunity = np.ndarray((size, size), dtype=np.float64, buffer=self.blocks[3].buf)
+        self.generation.fill(0)
+        self.immunity.fill(0)
+        bounds = np.linspace(0, size, min(stripes or self.workers, size) + 1).astype(int)
+        self.stripes = list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+        # Workers only need the rule tables, the random streams and the edges, not a board of their own.
+        rules = engine.ArrayEngine(0, 0, seed=self.seed, rules=self.rules, edges=self.topology.edges)
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=attach,
+            initargs=([block.name for block in self.blocks], size, rules),
+        )
+
+    @property
+    def types(self):
+        return self.buffers[self.tick % 2]
+
+    @types.setter
+    def types(self, types):
+        self.buffers[self.tick % 2][...] = types
+
+    def restore(self, state):
+        self.tick = state["tick"]
+        self.types = state["types"]
+        self.generation[...] = state["generation"]
+        self.immunity[...] = state["immunity"]
+
+    def step(self):
+        # Waiting for every stripe is the barrier that makes the halos of the next tick valid.
+        for stripe in [self.pool.submit(step_stripe, self.tick, *rows) for rows in self.stripes]:
+            stripe.result()
+        self.tick += 1
+        return self.types
+
+    def close(self):
+        self.pool.shutdown()
+        for block in self.blocks:
+            block.close()
+            block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def report_scaling(size=2000, density=0.3, num_ticks=20, workers=None, seed=0):
+    # Ticks per second of the single process engine and of TiledEngine on an increasing number of cores.
+    workers = workers or sorted({1, 2, 4, 8, os.cpu_count()} & set(range(1, os.cpu_count() + 1)))
+    num_spawn = int(size * size * density)
+    single = engine.ArrayEngine(size, num_spawn, seed=seed)
+    single.first_gen()
+    start = time.perf_counter()
+    for _ in range(num_ticks):
+        single.step()
+    baseline = num_ticks / (time.perf_counter() - start)
+    print(f"{size}x{size}, {num_ticks} ticks")
+    print(f"single process: {baseline:.2f} ticks/sec")
+    report = {"single": baseline}
+    for count in workers:
+        with TiledEngine(size, num_spawn, seed=seed, workers=count) as tiled:
+            tiled.first_gen()
+            tiled.step()
+            start = time.perf_counter()
+            for _ in range(num_ticks - 1):
+                tiled.step()
+            rate = (num_ticks - 1) / (time.perf_counter() - start)
+            if not np.array_equal(tiled.types, single.types):
+                raise AssertionError(f"{count} workers diverged from the single process engine")
+        report[count] = rate
+        print(f"{count} workers: {rate:.2f} ticks/sec, speedup {rate / baseline:.2f}x")
+    return report
+
+
+if __name__ == "__main__":
+    report_scaling()
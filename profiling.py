@@ -0,0 +1,64 @@
+"""
+Optional instrumentation of the tick loop.
+A Profiler attached to a Board (Board(profile=True)) records for every generation--
+    1. The time spent in each phase: the rule phases of the engine (immunity, population, interactions)
+       and the work around them (step, save, statistics, detection, checkpoint, callbacks).
+    2. How often the rules fired: immunity deaths, population deaths, kills, transformations and births.
+The parallel engine applies its rules inside worker processes, so only the phases around the step are timed for it.
+When no profiler is attached none of this code runs.
+"""
+import time
+from collections import defaultdict
+
+EVENTS = ("immunity deaths", "population deaths", "kills", "transformations", "births")
+
+
+class Profiler:
+    def __init__(self):
+        self.generations = []
+        self.timings = defaultdict(float)
+        self.events = defaultdict(int)
+        self.clock = time.perf_counter()
+
+    def start(self):
+        self.clock = time.perf_counter()
+
+    def lap(self, phase):
+        # Adds the time since the previous lap to phase.
+        now = time.perf_counter()
+        self.timings[phase] += now - self.clock
+        self.clock = now
+
+    def add(self, phase, seconds):
+        self.timings[phase] += seconds
+
+    def count(self, event, number):
+        self.events[event] += int(number)
+
+    def end_tick(self, generation):
+        self.generations.append({"Generation": generation, "Timings": dict(self.timings), "Events": dict(self.events)})
+        self.timings.clear()
+        self.events.clear()
+
+    def totals(self):
+        timings, events = defaultdict(float), {event: 0 for event in EVENTS}
+        for record in self.generations:
+            for phase, seconds in record["Timings"].items():
+                timings[phase] += seconds
+            for event, number in record["Events"].items():
+                events[event] += number
+        return dict(timings), events
+
+    def report(self):
+        timings, events = self.totals()
+        ticks = max(len(self.generations), 1)
+        # The rule phases are part of the step, so only the outer phases add up to the run time.
+        outer = ("step", "save", "statistics", "detection", "checkpoint", "callbacks")
+        total = sum(seconds for phase, seconds in timings.items() if phase in outer)
+        lines = [f"Profiled {len(self.generations)} generations in {total:.3f}s"]
+        for phase, seconds in sorted(timings.items(), key=lambda item: -item[1]):
+            share = 100 * seconds / total if total else 0
+            lines.append(f"    {phase:<15}{seconds:>10.3f}s {share:>6.1f}% {1000 * seconds / ticks:>10.3f}ms/tick")
+        for event, number in events.items():
+            lines.append(f"    {event:<20}{number:>10} {number / ticks:>10.1f}/tick")
+        return "\n".join(lines)
@@ -0,0 +1,112 @@
+"""
+Headless rendering of saved animations, for machines without a display.
+Every frame is turned into an RGB image with a single palette lookup on its array of particle type codes,
+coloured with constants.COLORS and laid out like Animator draws it (row i of the board is column i of the image).
+Frames can be written as a PNG sequence (optionally rendered by several worker processes), an animated GIF,
+or an MP4 when ffmpeg is installed.
+"""
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib import colors
+import constants
+import engine
+import storage
+
+
+def palette():
+    # RGB colour of every particle type code. Turtle colour names like "dark green" are spelled without spaces.
+    return np.array([
+        [round(255 * channel) for channel in colors.to_rgb(constants.COLORS[name].replace(" ", ""))]
+        for name in engine.TYPES
+    ], dtype=np.uint8)
+
+
+def frame_image(frame, scale=1, colours=None):
+    colours = palette() if colours is None else colours
+    image = colours[storage.frame_codes(frame).T]
+    if scale > 1:
+        image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    return image
+
+
+def save_png(image, path):
+    from PIL import Image
+    Image.fromarray(image).save(path)
+
+
+def render_range(animation_path, directory, first, last, scale):
+    # Worker side of FrameExporter.export_png, every worker opens the animation on its own.
+    colours = palette()
+    frames = storage.open_animation(animation_path).frames(first, last)
+    for generation, frame in enumerate(frames, start=first):
+        save_png(frame_image(frame, scale, colours), os.path.join(directory, f"{generation:06d}.png"))
+    return first, last
+
+
+class FrameExporter:
+    def __init__(self, animation_path, start=0, cut=None, scale=4):
+        print("STARTING EXPORT ENGINE...")
+        self.animation_path = animation_path
+        self.start = start
+        self.cut = cut
+        self.scale = scale
+
+    def load_world(self):
+        return storage.open_animation(self.animation_path)
+
+    def stop(self):
+        # Same window as Animator, cut frames from start. Only the binary and delta formats know their length.
+        if self.cut:
+            return min(self.start + self.cut, len(self.load_world()))
+        return len(self.load_world())
+
+    def images(self):
+        colours = palette()
+        stop = self.start + self.cut if self.cut else None
+        for frame in self.load_world().frames(self.start, stop):
+            yield frame_image(frame, self.scale, colours)
+
+    def export_png(self, directory, workers=1, chunk=50):
+        os.makedirs(directory, exist_ok=True)
+        # Pickled animations can only be read from the start, every worker would unpickle all frames before its own.
+        if workers == 1 or isinstance(self.load_world(), storage.AnimationReader):
+            for generation, image in enumerate(self.images(), start=self.start):
+                save_png(image, os.path.join(directory, f"{generation:06d}.png"))
+        else:
+            stop = self.stop()
+            ranges = [(first, min(first + chunk, stop)) for first in range(self.start, stop, chunk)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                for job in [pool.submit(render_range, self.animation_path, directory, *r, self.scale) for r in ranges]:
+                    job.result()
+        print(f"Frames written to {directory}")
+
+    def export_gif(self, save_path, fps=10):
+        from PIL import Image
+        images = (Image.fromarray(image) for image in self.images())
+        first = next(images)
+        first.save(save_path, save_all=True, append_images=images, duration=round(1000 / fps), loop=0)
+        print(f"GIF written to {save_path}")
+
+    def export_video(self, save_path, fps=30):
+        ffmpeg = shutil.which("ffmpeg")
+        if not ffmpeg:
+            raise RuntimeError("Exporting video needs ffmpeg on the PATH, export_gif or export_png work without it")
+        images = self.images()
+        first = next(images)
+        height, width = first.shape[:2]
+        # libx264 with yuv420p wants even dimensions.
+        pad = f"pad={width + width % 2}:{height + height % 2}"
+        process = subprocess.Popen([
+            ffmpeg, "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+            "-r", str(fps), "-i", "-", "-vf", pad, "-pix_fmt", "yuv420p", "-vcodec", "libx264", save_path,
+        ], stdin=subprocess.PIPE)
+        process.stdin.write(first.tobytes())
+        for image in images:
+            process.stdin.write(image.tobytes())
+        process.stdin.close()
+        if process.wait():
+            raise RuntimeError(f"ffmpeg failed to write {save_path}")
+        print(f"Video written to {save_path}")
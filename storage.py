@@ -0,0 +1,663 @@
+"""
+Reading and writing of .gol animation files.
+An animation is written as a stream of pickles--
+    1. The "Meta" block, written before the first generation is computed.
+    2. One pickle per generation, appended and flushed as soon as that generation exists.
+So a run never has to keep its generations in memory, and a crashed run keeps every generation written so far.
+Every format leaves META_SLACK bytes of room after its Meta block, so that what is only known once a run ends
+(like the generation it settled at) can still be added to the Meta with update_meta.
+Older .gol files, a single pickle of {"Meta": ..., "Animation": [...]} (or just the list of frames), can still be read.
+"""
+import bisect
+import itertools
+import json
+import mmap
+import os
+import pickle
+import struct
+import zlib
+import numpy as np
+import detection
+import engine
+
+
+# The most a run adds to its Meta once it is under way, an Outcome entry for every event detection.py reports
+# (see Board.record_outcome) and its generation counts (see Board.save_checkpoint), for a billion generations.
+# Converted copies note how many frames they were converted from instead (see convert_to_binary).
+LATE_META = {"Outcome": [{"Event": event, "Generation": 10 ** 9, "Since": 10 ** 9, "Period": 10 ** 9, "Stopped": False}
+                         for event in detection.EVENTS],
+             "No. of generations computed": 10 ** 9, "Target Ticks": 10 ** 9, "Source Frames": 10 ** 9}
+META_SLACK = max(len(json.dumps(LATE_META)), len(pickle.dumps(LATE_META, protocol=pickle.HIGHEST_PROTOCOL)))
+# Pickle writes byte strings shorter than 256 bytes with a shorter header, so the "Slack" entry of a .gol file
+# never gets below that and its block keeps the same length whatever the slack.
+PICKLE_PADDING = 256
+
+
+def pickle_meta(meta, length=None):
+    # The Meta block of a .gol file, padded with a "Slack" entry to length bytes (or META_SLACK bytes to spare).
+    base = len(pickle.dumps({"Meta": meta, "Slack": b" " * PICKLE_PADDING}, protocol=pickle.HIGHEST_PROTOCOL))
+    slack = META_SLACK if length is None else length - base
+    if slack < 0:
+        raise ValueError("The Meta block has no room left for the update")
+    return pickle.dumps({"Meta": meta, "Slack": b" " * (PICKLE_PADDING + slack)}, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def json_meta(meta, length=None):
+    # The Meta block of the binary formats, JSON padded with spaces to length bytes (or META_SLACK bytes to spare).
+    data = json.dumps(meta).encode()
+    if length is None:
+        return data + b" " * META_SLACK
+    if len(data) > length:
+        raise ValueError("The Meta block has no room left for the update")
+    return data.ljust(length)
+
+
+def reopen(path, resume):
+    # Every writer takes resume, the position() it reported when a checkpoint was taken, to continue an
+    # existing animation instead of starting a new one. Anything written after that checkpoint is dropped,
+    # and the Meta block stays the one the animation was started with.
+    f = open(path, "r+b")
+    f.truncate(resume["offset"])
+    f.seek(resume["offset"])
+    return f
+
+
+class AnimationWriter:
+    def __init__(self, path, meta, resume=None):
+        self.path = path
+        self.count = resume["count"] if resume else 0
+        self.file = reopen(path, resume) if resume else open(path, "wb")
+        self.pickler = pickle.Pickler(self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        if resume:
+            reader = AnimationReader(path)
+            self.meta, self.meta_length = reader.meta, reader.meta_length
+        else:
+            self.meta = meta
+            block = pickle_meta(meta)
+            self.meta_length = len(block)
+            self.file.write(block)
+            self.file.flush()
+
+    def update_meta(self, changes):
+        # Rewrites the Meta block in place with changes merged into it.
+        self.meta = {**self.meta, **changes}
+        block = pickle_meta(self.meta, self.meta_length)
+        end = self.file.tell()
+        self.file.seek(0)
+        self.file.write(block)
+        self.file.seek(end)
+        self.file.flush()
+
+    def position(self):
+        return {"offset": self.file.tell(), "count": self.count}
+
+    def dump(self, obj):
+        self.pickler.dump(obj)
+        # Forget what has been pickled so far, otherwise the memo keeps every frame alive.
+        self.pickler.clear_memo()
+        self.file.flush()
+
+    def write(self, frame, ages=None):
+        # Pickled frames carry their own particles, ages are only needed by the binary format.
+        self.dump(frame)
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AnimationReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            head = pickle.load(f)
+            self.meta_length = f.tell()
+        if isinstance(head, dict):
+            self.meta = head["Meta"]
+            self.streamed = "Animation" not in head
+        else:
+            self.meta = {}
+            self.streamed = False
+
+    def __iter__(self):
+        with open(self.path, "rb") as f:
+            head = pickle.load(f)
+            if not self.streamed:
+                yield from head["Animation"] if isinstance(head, dict) else head
+                return
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+                except pickle.UnpicklingError:
+                    # The last frame of a run that crashed while writing it.
+                    return
+
+    def frames(self, start=0, stop=None):
+        return itertools.islice(self, start, stop)
+
+
+
+# Compact binary animations (.golb).
+# A small header followed by fixed size frames, so generation N always starts at a known offset
+# and the file can be memory mapped and sliced without reading anything else.
+#     1. Header -- magic, version, grid size, number of frames, flags and the Meta block as JSON.
+#     2. Frames -- size x size particle type codes (see engine.TYPES), followed by size x size uint16 ages
+#        when the file was written with ages.
+HEADER = struct.Struct("<4sHIIBI")
+MAGIC = b"GOLB"
+VERSION = 1
+WITH_AGES = 1
+ALIGNMENT = 16
+
+
+def frame_codes(frame):
+    # Particle type codes of a frame, whichever engine produced it.
+    if isinstance(frame, dict):
+        size = max(i for i, _ in frame) + 1
+        codes = np.zeros((size, size), dtype=np.uint8)
+        for (i, j), particle in frame.items():
+            codes[i, j] = engine.CODES[particle.__str__()]
+        return codes
+    return np.asarray(frame, dtype=np.uint8)
+
+
+def frame_ages(frame):
+    # Generation of every particle in a dict frame, 0 for empty cells.
+    size = max(i for i, _ in frame) + 1
+    ages = np.zeros((size, size), dtype=np.uint32)
+    for (i, j), particle in frame.items():
+        ages[i, j] = getattr(particle, "generation", 0)
+    return ages
+
+
+def frames_with_ages(reader, start=0, stop=None):
+    # (type codes, ages or None) of every frame of reader from start to stop, ages where the animation has them.
+    if isinstance(reader, BinaryReader):
+        ages = reader.records["ages"][start:stop] if reader.has_ages else itertools.repeat(None)
+        return zip(reader.frames(start, stop), ages)
+    return ((frame_codes(frame), frame_ages(frame) if isinstance(frame, dict) else None)
+            for frame in reader.frames(start, stop))
+
+
+class BinaryWriter:
+    def __init__(self, path, meta, size, ages=False, resume=None):
+        self.path = path
+        self.size = size
+        self.ages = ages
+        self.count = 0
+        self.meta = meta
+        self.meta_block = json_meta(meta)
+        if resume:
+            # Frames start right after the Meta block, so the one already in the file has to stay.
+            reader = BinaryReader(path)
+            self.meta = reader.meta
+            self.meta_block = reader.mmap[HEADER.size:HEADER.size + reader.meta_length]
+            self.ages = reader.has_ages
+            reader.mmap.close()
+            self.count = resume["count"]
+            self.file = reopen(path, resume)
+            return
+        self.file = open(path, "wb")
+        self.file.write(self.header())
+        self.file.flush()
+
+    def position(self):
+        return {"offset": self.file.tell(), "count": self.count}
+
+    def header(self):
+        header = HEADER.pack(MAGIC, VERSION, self.size, self.count, WITH_AGES if self.ages else 0,
+                             len(self.meta_block))
+        header += self.meta_block
+        return header + b"\0" * (-len(header) % ALIGNMENT)
+
+    def update_meta(self, changes):
+        # The Meta block is part of the header, which close() writes again.
+        self.meta = {**self.meta, **changes}
+        self.meta_block = json_meta(self.meta, len(self.meta_block))
+
+    def write(self, frame, ages=None):
+        self.file.write(frame_codes(frame).tobytes())
+        if self.ages:
+            if ages is None:
+                ages = frame_ages(frame)
+            self.file.write(np.minimum(ages, np.iinfo(np.uint16).max).astype("<u2").tobytes())
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        # The frame count in the header is only informative, readers trust the file size.
+        self.file.seek(0)
+        self.file.write(self.header())
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinaryReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, _, flags, meta_length = HEADER.unpack_from(self.mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} binary animation")
+        self.meta = json.loads(self.mmap[HEADER.size:HEADER.size + meta_length])
+        self.meta_length = meta_length
+        self.has_ages = bool(flags & WITH_AGES)
+        fields = [("types", np.uint8, (self.size, self.size))]
+        if self.has_ages:
+            fields.append(("ages", "<u2", (self.size, self.size)))
+        record = np.dtype(fields)
+        offset = HEADER.size + meta_length
+        offset += -offset % ALIGNMENT
+        # A run that crashed mid frame leaves a partial record at the end, which is ignored.
+        count = (len(self.mmap) - offset) // record.itemsize
+        self.records = np.ndarray((count,), dtype=record, buffer=self.mmap, offset=offset)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, generation):
+        return self.records["types"][generation]
+
+    def ages(self, generation):
+        if not self.has_ages:
+            raise ValueError(f"{self.path} was written without ages")
+        return self.records["ages"][generation]
+
+    def __iter__(self):
+        return iter(self.records["types"])
+
+    def frames(self, start=0, stop=None):
+        return iter(self.records["types"][start:stop])
+
+
+# Delta encoded animations (.gold).
+# Most cells do not change from one generation to the next once a run settles, so apart from a full keyframe
+# every keyframe_interval generations, only the cells that changed are stored.
+#     1. Header -- magic, version, grid size, keyframe interval and the Meta block as JSON.
+#     2. Records -- kind, generation and payload length, followed by the zlib compressed payload--
+#         a. KEYFRAME -- size x size particle type codes.
+#         b. DELTA -- uint32 flat indices of the changed cells, then their new uint8 type codes.
+# Reading generation N starts from the last keyframe before it and replays the deltas up to N.
+DELTA_HEADER = struct.Struct("<4sHIII")
+DELTA_MAGIC = b"GOLD"
+RECORD = struct.Struct("<BII")
+KEYFRAME, DELTA = 0, 1
+KEYFRAME_INTERVAL = 100
+
+
+class DeltaWriter:
+    def __init__(self, path, meta, size, keyframe_interval=KEYFRAME_INTERVAL, resume=None):
+        self.path = path
+        self.size = size
+        self.keyframe_interval = keyframe_interval
+        self.count = 0
+        self.previous = None
+        self.meta = meta
+        if resume:
+            reader = DeltaReader(path)
+            self.keyframe_interval = reader.keyframe_interval
+            self.meta, self.meta_length = reader.meta, reader.meta_length
+            reader.mmap.close()
+            self.count = resume["count"]
+            self.previous = resume["previous"]
+            self.file = reopen(path, resume)
+            return
+        self.file = open(path, "wb")
+        block = json_meta(meta)
+        self.meta_length = len(block)
+        self.file.write(DELTA_HEADER.pack(DELTA_MAGIC, VERSION, size, keyframe_interval, len(block)) + block)
+        self.file.flush()
+
+    def update_meta(self, changes):
+        # Rewrites the Meta block in place with changes merged into it.
+        self.meta = {**self.meta, **changes}
+        block = json_meta(self.meta, self.meta_length)
+        end = self.file.tell()
+        self.file.seek(DELTA_HEADER.size)
+        self.file.write(block)
+        self.file.seek(end)
+        self.file.flush()
+
+    def position(self):
+        return {"offset": self.file.tell(), "count": self.count, "previous": self.previous}
+
+    def write(self, frame, ages=None):
+        # Ages change for every living cell every generation, so delta files only keep particle types.
+        codes = frame_codes(frame)
+        if self.count % self.keyframe_interval == 0:
+            kind, payload = KEYFRAME, codes.tobytes()
+        else:
+            changed = np.flatnonzero(codes != self.previous)
+            kind, payload = DELTA, changed.astype("<u4").tobytes() + codes.flat[changed].tobytes()
+        payload = zlib.compress(payload, 1)
+        self.file.write(RECORD.pack(kind, self.count, len(payload)) + payload)
+        self.file.flush()
+        self.previous = codes.copy()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class DeltaReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.keyframe_interval, meta_length = DELTA_HEADER.unpack_from(self.mmap)
+        if magic != DELTA_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} delta animation")
+        self.meta = json.loads(self.mmap[DELTA_HEADER.size:DELTA_HEADER.size + meta_length])
+        self.meta_length = meta_length
+        # Only the record headers are read here, payloads are skipped over.
+        self.records = []
+        self.keyframes = []
+        offset = DELTA_HEADER.size + meta_length
+        while offset + RECORD.size <= len(self.mmap):
+            kind, generation, length = RECORD.unpack_from(self.mmap, offset)
+            if offset + RECORD.size + length > len(self.mmap):
+                # A run that crashed mid record.
+                break
+            if kind == KEYFRAME:
+                self.keyframes.append(generation)
+            self.records.append((kind, offset + RECORD.size, length))
+            offset += RECORD.size + length
+
+    def __len__(self):
+        return len(self.records)
+
+    def apply(self, frame, generation):
+        kind, offset, length = self.records[generation]
+        payload = zlib.decompress(self.mmap[offset:offset + length])
+        if kind == KEYFRAME:
+            frame[...] = np.frombuffer(payload, np.uint8).reshape(self.size, self.size)
+        else:
+            changed = len(payload) // 5
+            cells = np.frombuffer(payload, "<u4", changed)
+            frame.flat[cells] = np.frombuffer(payload, np.uint8, changed, 4 * changed)
+
+    def __getitem__(self, generation):
+        if generation < 0:
+            generation += len(self)
+        if not 0 <= generation < len(self):
+            raise IndexError(generation)
+        frame = np.zeros((self.size, self.size), dtype=np.uint8)
+        keyframe = self.keyframes[bisect.bisect_right(self.keyframes, generation) - 1]
+        for record in range(keyframe, generation + 1):
+            self.apply(frame, record)
+        return frame
+
+    def __iter__(self):
+        return self.frames()
+
+    def frames(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        frame = self[start]
+        yield frame.copy()
+        for generation in range(start + 1, stop):
+            self.apply(frame, generation)
+            yield frame.copy()
+
+
+# Time-major animations (.golt), written from any saved animation by convert_to_time_major.
+# Every other format stores one frame after the other, so the history of a single cell is spread over the whole file.
+# Here the history of every cell is stored in one piece instead, so a cell or a rectangle of cells can be read over
+# any range of ticks from a memory map without decoding a single frame.
+#     1. Header -- the binary format's header with TIME_MAGIC, the frame count and the Meta block as JSON.
+#     2. Types -- size x size x frames particle type codes, the history of cell (i, j) at [i, j, :].
+#     3. Ages -- size x size x frames uint16 ages laid out the same way, when the file was written with ages.
+TIME_MAGIC = b"GOLT"
+TIME_BLOCK = 256
+
+
+def time_major_layout(size, count, meta_length, ages):
+    # Offsets of the types and ages arrays and the length of a .golt file.
+    types = HEADER.size + meta_length
+    types += -types % ALIGNMENT
+    end = types + size * size * count
+    if not ages:
+        return types, None, end
+    end += -end % ALIGNMENT
+    return types, end, end + 2 * size * size * count
+
+
+class TimeMajorReader:
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.size, self.count, flags, meta_length = HEADER.unpack_from(self.mmap)
+        if magic != TIME_MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} time-major animation")
+        self.meta = json.loads(self.mmap[HEADER.size:HEADER.size + meta_length])
+        self.meta_length = meta_length
+        self.has_ages = bool(flags & WITH_AGES)
+        types, ages, _ = time_major_layout(self.size, self.count, meta_length, self.has_ages)
+        shape = (self.size, self.size, self.count)
+        self.types = np.ndarray(shape, dtype=np.uint8, buffer=self.mmap, offset=types)
+        self.ages = np.ndarray(shape, dtype="<u2", buffer=self.mmap, offset=ages) if self.has_ages else None
+
+    def __len__(self):
+        return self.count
+
+    def cell(self, i, j, start=0, stop=None):
+        # Type codes of cell (i, j) from generation start to stop.
+        return self.types[i, j, start:stop]
+
+    def cell_ages(self, i, j, start=0, stop=None):
+        if not self.has_ages:
+            raise ValueError(f"{self.path} was written without ages")
+        return self.ages[i, j, start:stop]
+
+    def region(self, top, left, bottom, right, start=0, stop=None):
+        # Type codes of rows top to bottom and columns left to right, shape (rows, columns, generations).
+        return self.types[top:bottom, left:right, start:stop]
+
+    def region_ages(self, top, left, bottom, right, start=0, stop=None):
+        if not self.has_ages:
+            raise ValueError(f"{self.path} was written without ages")
+        return self.ages[top:bottom, left:right, start:stop]
+
+    def population(self, top, left, bottom, right, start=0, stop=None):
+        # Number of particles of every type in the region at every generation, shape (generations, len(TYPES)).
+        # Only one row of the region is read at a time.
+        generations = len(range(*slice(start, stop).indices(self.count)))
+        counts = np.zeros((generations, len(engine.TYPES)), dtype=np.int64)
+        for row in self.region(top, left, bottom, right, start, stop):
+            for code in range(len(engine.TYPES)):
+                counts[:, code] += (row == code).sum(axis=0)
+        return counts
+
+    def frames(self, start=0, stop=None):
+        # Whole frames have to be gathered from every cell's history, the other formats are far better at this.
+        for generation in range(*slice(start, stop).indices(self.count)):
+            yield np.ascontiguousarray(self.types[:, :, generation])
+
+    def __iter__(self):
+        return self.frames()
+
+
+def convert_to_time_major(path, ages=True, block=TIME_BLOCK):
+    """
+    Writes path.golt, the time-major copy of the animation at path (in whichever format it was saved),
+    with ages when asked for and the animation has them. block frames at a time are transposed into place.
+    """
+    reader = open_animation(path)
+    # Pickled animations do not know their length without reading them once.
+    count = sum(1 for _ in reader) if isinstance(reader, AnimationReader) else len(reader)
+    frames = frames_with_ages(reader)
+    first = next(frames, None)
+    if first is None:
+        raise ValueError(f"{path} has no frames to convert")
+    size = first[0].shape[0]
+    ages = ages and first[1] is not None
+    # How many frames were converted, so that a copy left behind by resuming or extending the run can be told apart.
+    meta_block = json_meta({**reader.meta, "Source Frames": count})
+    types_offset, ages_offset, end = time_major_layout(size, count, len(meta_block), ages)
+    with open(f"{path}.golt.tmp", "wb") as f:
+        f.write(HEADER.pack(TIME_MAGIC, VERSION, size, count, WITH_AGES if ages else 0, len(meta_block)) + meta_block)
+        f.truncate(end)
+    shape = (size, size, count)
+    types = np.memmap(f"{path}.golt.tmp", dtype=np.uint8, mode="r+", offset=types_offset, shape=shape)
+    histories = np.memmap(f"{path}.golt.tmp", dtype="<u2", mode="r+", offset=ages_offset, shape=shape) if ages else None
+    frames = itertools.chain([first], frames)
+    for done in range(0, count, block):
+        chunk = list(itertools.islice(frames, block))
+        types[:, :, done:done + len(chunk)] = np.stack([codes for codes, _ in chunk], axis=-1)
+        if ages:
+            histories[:, :, done:done + len(chunk)] = np.minimum(np.stack([age for _, age in chunk], axis=-1),
+                                                                 np.iinfo(np.uint16).max)
+    # The maps have to be flushed and let go of before the file is moved into place.
+    for array in (types, histories):
+        if array is not None:
+            array.flush()
+    del types, histories
+    os.replace(f"{path}.golt.tmp", f"{path}.golt")
+    return f"{path}.golt"
+
+
+def current_time_major(path):
+    """
+    The TimeMajorReader of path.golt when it holds every frame of the animation at path, None when there is no copy
+    or the run has been resumed or extended since it was converted (or the copy predates Source Frames).
+    Pickled animations are not read through to count their frames, their Meta tells how many were computed.
+    """
+    if not os.path.isfile(f"{path}.golt"):
+        return None
+    copy = TimeMajorReader(f"{path}.golt")
+    reader = open_animation(path)
+    frames = reader.meta.get("No. of generations computed") if isinstance(reader, AnimationReader) else len(reader)
+    return copy if copy.meta.get("Source Frames") == frames else None
+
+
+# Statistics index (.gols).
+# One line of JSON per generation, written while the simulation runs, with the population of every particle type
+# and how many cells were born into, died out of or changed between particle types since the previous generation.
+# These are net changes between consecutive frames, a cell that dies and is reborn as the same type within one
+# tick is not counted. The first generation written has nothing to compare with and counts no changes.
+class StatisticsWriter:
+    def __init__(self, path, resume=None):
+        self.path = path
+        self.count = resume["count"] if resume else 0
+        self.previous = resume["previous"] if resume else None
+        self.file = reopen(path, resume) if resume else open(path, "wb")
+
+    def position(self):
+        return {"offset": self.file.tell(), "count": self.count, "previous": self.previous}
+
+    def write(self, frame):
+        codes = frame_codes(frame)
+        counts = np.bincount(codes.ravel(), minlength=len(engine.TYPES))
+        record = {name: int(counts[code]) for code, name in enumerate(engine.TYPES)}
+        births = np.zeros(len(engine.TYPES), dtype=np.int64)
+        deaths = np.zeros(len(engine.TYPES), dtype=np.int64)
+        transformations = 0
+        if self.previous is not None:
+            changed = codes != self.previous
+            born = changed & (self.previous == engine.EMPTY)
+            died = changed & (codes == engine.EMPTY)
+            births = np.bincount(codes[born], minlength=len(engine.TYPES))
+            deaths = np.bincount(self.previous[died], minlength=len(engine.TYPES))
+            transformations = int((changed & ~born & ~died).sum())
+        record["BIRTHS"] = {name: int(births[code]) for code, name in enumerate(engine.TYPES) if code}
+        record["DEATHS"] = {name: int(deaths[code]) for code, name in enumerate(engine.TYPES) if code}
+        record["TRANSFORMATIONS"] = transformations
+        self.file.write(json.dumps(record).encode() + b"\n")
+        self.file.flush()
+        self.previous = codes.copy()
+        self.count += 1
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_statistics(path, start=0, stop=None):
+    # Yields the records of path.gols for generations start to stop, without touching the animation itself.
+    with open(path, "rb") as f:
+        for line in itertools.islice(f, start, stop):
+            if not line.endswith(b"\n"):
+                # A run that crashed mid line.
+                return
+            yield json.loads(line)
+
+
+READERS = {"gol": AnimationReader, "golb": BinaryReader, "gold": DeltaReader}
+
+
+def open_file(file):
+    # The reader of one animation file by its extension, whatever other formats of the same run lie next to it.
+    return READERS[file.rsplit(".", 1)[-1]](file)
+
+
+def open_animation(path):
+    # Prefers the binary, then the delta encoded animation, over path.gol when several exist,
+    # unless it is a copy of a path.gol that has been resumed or extended since it was converted.
+    for extension in ("golb", "gold"):
+        if os.path.isfile(f"{path}.{extension}"):
+            reader = open_file(f"{path}.{extension}")
+            if converted_current(reader, path):
+                return reader
+    return AnimationReader(f"{path}.gol")
+
+
+def converted_current(reader, path):
+    # Whether a binary or delta animation was not converted from path.gol, or holds every frame path.gol has.
+    # The frames of path.gol are told by its Meta, files from before it kept count are trusted to match.
+    source = reader.meta.get("Source Frames")
+    if source is None or not os.path.isfile(f"{path}.gol"):
+        return True
+    computed = AnimationReader(f"{path}.gol").meta.get("No. of generations computed")
+    return not computed or computed == source
+
+
+def convert_to_binary(path, ages=True):
+    # Migrates path.gol (any pickle layout) to path.golb.
+    reader = AnimationReader(f"{path}.gol")
+    frames = iter(reader)
+    first = next(frames)
+    size = frame_codes(first).shape[0]
+    with BinaryWriter(f"{path}.golb", reader.meta, size, ages=ages and isinstance(first, dict)) as writer:
+        for frame in itertools.chain([first], frames):
+            writer.write(frame)
+        writer.update_meta({"Source Frames": writer.count})
+    return f"{path}.golb"
+
+
+def convert_to_delta(path, keyframe_interval=KEYFRAME_INTERVAL):
+    # Migrates path.gol (any pickle layout) to path.gold.
+    reader = AnimationReader(f"{path}.gol")
+    frames = iter(reader)
+    first = frame_codes(next(frames))
+    with DeltaWriter(f"{path}.gold", reader.meta, first.shape[0], keyframe_interval=keyframe_interval) as writer:
+        for frame in itertools.chain([first], frames):
+            writer.write(frame)
+        writer.update_meta({"Source Frames": writer.count})
+    return f"{path}.gold"
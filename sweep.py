@@ -0,0 +1,82 @@
+"""
+Parameter sweeps over the rules in constants.py.
+Every combination of the given rule values is simulated with the numpy engine in a pool of worker processes.
+Instead of full animations only a compact summary of every run is kept--
+    1. The population of every particle type at every tick (tick 0 being the first generation).
+    2. The tick at which every particle type, and the board as a whole, went extinct (None if it never did).
+    3. The Outcome, the events detection.SteadyStateDetector noticed (extinction, fixed points and cycles).
+A run stops at the first of the stop_on events, by default as soon as the board is empty,
+nothing can ever be born on an empty board.
+"""
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import detection
+import engine
+
+
+def expand_grid(grid):
+    # {"IMMUNITY.CITIZEN": [1000, 4000], "GOD_KILL_RATE.KILLER": [0.5, 0.9]} -> one overrides dict per combination.
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def summarise(size, num_spawn, num_ticks, rules, seed, stop_on=("extinction",)):
+    world = engine.ArrayEngine(size, num_spawn, seed=seed, rules=rules)
+    types = world.first_gen()
+    population = {name: [] for name in engine.TYPES[1:]}
+    extinction = {name: None for name in engine.TYPES[1:]}
+    extinct = None
+    detector = detection.SteadyStateDetector()
+    outcome = []
+    for tick in range(num_ticks + 1):
+        if tick:
+            types = world.step()
+        counts = np.bincount(types.ravel(), minlength=len(engine.TYPES))
+        for code, name in enumerate(engine.TYPES[1:], start=1):
+            population[name].append(int(counts[code]))
+            if not counts[code] and extinction[name] is None:
+                extinction[name] = tick
+        if counts[engine.EMPTY] == types.size and extinct is None:
+            extinct = tick
+        event = detector.observe(tick, types)
+        if event:
+            event["Stopped"] = event["Event"] in stop_on
+            outcome.append(event)
+            if event["Stopped"]:
+                break
+    return {
+        "Rules": rules,
+        "Seed": world.seed,
+        "Population": population,
+        "Extinction": extinction,
+        "Extinct": extinct,
+        "Outcome": outcome,
+    }
+
+
+def run_sweep(grid, size=100, num_spawn=3000, num_ticks=1000, seeds=(0,), workers=None, save_path=None,
+              stop_on=("extinction",)):
+    """
+    Simulates every combination in grid (see expand_grid) once per seed and returns the list of summaries,
+    also written to save_path as JSON when given.
+    grid may also be a list of overrides dicts to run as they are.
+    """
+    configurations = expand_grid(grid) if isinstance(grid, dict) else list(grid)
+    runs = [(rules, seed) for rules in configurations for seed in seeds]
+    print(f"Sweeping {len(runs)} runs...")
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [pool.submit(summarise, size, num_spawn, num_ticks, rules, seed, stop_on) for rules, seed in runs]
+        summaries = [future.result() for future in futures]
+    print("Sweep Completed!")
+    if save_path:
+        with open(save_path, "w") as f:
+            json.dump({
+                "Grid Size": size,
+                "Spawned Elements": num_spawn,
+                "No. of generations computed": num_ticks,
+                "Runs": summaries,
+            }, f)
+    return summaries
@@ -0,0 +1,79 @@
+"""
+The neighbourhood of every cell of a board, built once per board size and edge mode.
+There are two kinds of edges--
+    1. bounded -- the board ends at its edges, cells on the edge have fewer neighbours.
+    2. toroidal -- the board wraps around, the top row neighbours the bottom row and the left column the right one.
+Every cell has up to four direct neighbours (DIRECT) and four diagonal ones (DIAGONAL).
+They are kept as flat cell indices for the array engines and as board positions for the particle classes,
+so looking up the neighbours of a cell is a gather instead of building and bounds checking coordinates.
+"""
+import functools
+import numpy as np
+
+DIRECT = ((0, -1), (-1, 0), (1, 0), (0, 1))
+DIAGONAL = ((-1, -1), (1, -1), (-1, 1), (1, 1))
+EDGES = ("bounded", "toroidal")
+
+
+@functools.lru_cache(maxsize=8)
+def get(size, edges="bounded"):
+    # Boards of the same size and edges share one Topology.
+    return Topology(size, edges)
+
+
+class Topology:
+    def __init__(self, size, edges="bounded"):
+        if edges not in EDGES:
+            raise ValueError(f"Unknown edges {edges!r}, expected one of {EDGES}")
+        self.size = size
+        self.edges = edges
+        self.wrap = edges == "toroidal"
+
+    def neighbours(self, cells, offsets=DIRECT + DIAGONAL):
+        # Flat indices of the neighbours of every cell, shape (len(offsets), cells), -1 where off the board.
+        rows, columns = np.divmod(np.asarray(cells, dtype=np.int64), self.size)
+        found = np.full((len(offsets), len(rows)), -1, dtype=np.int64)
+        for k, (di, dj) in enumerate(offsets):
+            i, j = rows + di, columns + dj
+            if self.wrap:
+                found[k] = (i % self.size) * self.size + j % self.size
+                continue
+            inside = (i >= 0) & (i < self.size) & (j >= 0) & (j < self.size)
+            found[k, inside] = i[inside] * self.size + j[inside]
+        return found
+
+    @functools.cached_property
+    def table(self):
+        # The eight neighbours (direct ones first) of every cell of the board, shape (8, size * size).
+        return self.neighbours(np.arange(self.size * self.size)).astype(np.int32)
+
+    def positions(self, offsets):
+        found = self.neighbours(np.arange(self.size * self.size), offsets).T.tolist()
+        return {divmod(cell, self.size): tuple(divmod(n, self.size) for n in row if n >= 0)
+                for cell, row in enumerate(found)}
+
+    @functools.cached_property
+    def direct_positions(self):
+        return self.positions(DIRECT)
+
+    @functools.cached_property
+    def diagonal_positions(self):
+        return self.positions(DIAGONAL)
+
+    @functools.cached_property
+    def neighbour_positions(self):
+        return {position: direct + self.diagonal_positions[position]
+                for position, direct in self.direct_positions.items()}
+
+    def fill_halo(self, padded):
+        """
+        Fills the one cell wide border around padded[..., 1:-1, 1:-1] with what lies beyond the edges:
+        nothing on a bounded board, the opposite side of the board on a toroidal one.
+        """
+        if not self.wrap:
+            return padded
+        padded[..., 0, :] = padded[..., -2, :]
+        padded[..., -1, :] = padded[..., 1, :]
+        padded[..., :, 0] = padded[..., :, -2]
+        padded[..., :, -1] = padded[..., :, 1]
+        return padded